@@ -1,8 +1,12 @@
 """
 Configuration management using Pydantic Settings
 """
+from functools import lru_cache
+from pydantic import PrivateAttr, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List
+from typing import Any, FrozenSet, Tuple
+
+from app.log_sink import parse_duration, parse_size
 
 
 class Settings(BaseSettings):
@@ -11,7 +15,8 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
-        case_sensitive=False
+        case_sensitive=False,
+        frozen=True  # Loaded once, read-only afterwards
     )
 
     # Application
@@ -29,6 +34,9 @@ class Settings(BaseSettings):
     mysql_password: str
     mysql_root_password: str
     database_url: str
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_recycle_seconds: int = 1800
 
     # phpMyAdmin
     pma_host: str = "mysql"
@@ -37,34 +45,98 @@ class Settings(BaseSettings):
     # Logging
     log_level: str = "INFO"
     log_path: str = "./logs"
-    log_rotation: str = "10 MB"
+    log_rotation: str = "10 MB"  # Size only (e.g., "10 MB"), no time-based rotation
     log_retention: str = "30 days"
 
     # Discord
     discord_webhook_url: str
     discord_retry_count: int = 3
     discord_retry_delay: int = 2
+    discord_dns_refresh_seconds: int = 300
 
     # Scheduler
     check_interval_hours: int = 2
     batch_size: int = 50
     delay_between_checks_ms: int = 100
     double_check_delay_seconds: int = 5
+    parallel_double_check: bool = False  # Query both DNS servers at once (no delay)
 
     # DNS
     dns_timeout_seconds: int = 5
     dns_retry_count: int = 2
     dns_primary_server: str = "8.8.8.8"
     dns_secondary_server: str = "1.1.1.1"
+    dns_cache_ttl_unavailable_seconds: int = 60
+    dns_cache_ttl_available_seconds: float = 1.0  # Keep below the 2s watcher tick
+    dns_cache_max_size: int = 10000
+    dns_prefetch_sibling_tlds: bool = False  # Warm the cache for the same name on the other TLDs
+    dns_calibration_probes: int = 10  # Probes per TLD and DNS server at startup (0 disables calibration)
+    dns_target_queries_per_second: int = 100
+    # Extra authoritative servers raced against the TLD server by watchers
+    # (comma-separated, empty = TLD server only)
+    watcher_extra_dns_servers: str = ""
 
     # Supported TLDs
     supported_tlds: str = "fr,com,net"
 
+    # Parsed once in model_post_init (see supported_tlds_set / supported_tlds_list)
+    _supported_tlds_list: Tuple[str, ...] = PrivateAttr(default=())
+    _supported_tlds_set: FrozenSet[str] = PrivateAttr(default=frozenset())
+
+    @field_validator("log_rotation")
+    @classmethod
+    def _check_log_rotation(cls, value: str) -> str:
+        """Reject rotations BatchedFileSink cannot apply (times, intervals)"""
+        try:
+            parse_size(value)
+        except ValueError:
+            raise ValueError(
+                f"LOG_ROTATION must be a size such as '10 MB' or '512 KiB' "
+                f"(time-based rotation is not supported): {value!r}"
+            ) from None
+        return value
+
+    @field_validator("log_retention")
+    @classmethod
+    def _check_log_retention(cls, value: str) -> str:
+        """Reject retentions BatchedFileSink cannot parse"""
+        try:
+            parse_duration(value)
+        except ValueError:
+            raise ValueError(
+                f"LOG_RETENTION must be a duration such as '30 days': {value!r}"
+            ) from None
+        return value
+
+    def model_post_init(self, __context: Any) -> None:
+        """Parse the supported TLDs CSV once at settings load"""
+        tlds = (tld.strip().lower() for tld in self.supported_tlds.split(","))
+        self._supported_tlds_list = tuple(dict.fromkeys(tld for tld in tlds if tld))
+        self._supported_tlds_set = frozenset(self._supported_tlds_list)
+
     @property
-    def supported_tlds_list(self) -> List[str]:
-        """Return supported TLDs as a list"""
-        return [tld.strip() for tld in self.supported_tlds.split(",")]
+    def supported_tlds_list(self) -> Tuple[str, ...]:
+        """Return supported TLDs as a tuple (configuration order)"""
+        return self._supported_tlds_list
+
+    @property
+    def supported_tlds_set(self) -> FrozenSet[str]:
+        """Return supported TLDs as a frozenset for O(1) membership tests"""
+        return self._supported_tlds_set
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Return the application settings (environment and .env parsed once)
+
+    Usage in FastAPI:
+        @app.get("/endpoint")
+        async def endpoint(settings: Settings = Depends(get_settings)):
+            ...
+    """
+    return Settings()
 
 
 # Global settings instance
-settings = Settings()
+settings = get_settings()
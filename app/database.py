@@ -1,18 +1,26 @@
 """
 Database connection and session management for MySQL
+
+Bulk reads (full-table iteration, exports, aggregations folded in Python)
+must use `await db.stream(stmt)` and iterate the result (or its
+`.partitions(size)`) instead of `execute(...).all()`, so rows are fetched
+through a server-side cursor instead of being materialized at once.
 """
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.config import settings
 
 # Create async engine for MySQL
+# The check cycle shares one session per batch and the watcher loop opens one
+# per tick, so the pool mostly serves API requests: it does not need to grow
+# with batch_size or the number of watched domains
 engine = create_async_engine(
     settings.database_url,
     echo=settings.app_debug,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
-    pool_recycle=3600,
+    pool_pre_ping=True,  # Drop connections closed by MySQL during idle cycles
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_recycle=settings.db_pool_recycle_seconds,
 )
 
 # Create async session factory
@@ -0,0 +1,211 @@
+"""
+Batched file sink for Loguru - write log records in chunks from a background thread
+"""
+import os
+import re
+import sys
+import threading
+import time
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+
+_SIZE_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([kmg]?)(i?)b\s*$", re.IGNORECASE)
+_DURATION_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([a-z]+)\s*$", re.IGNORECASE)
+_DURATION_UNITS = {
+    "s": 1, "second": 1, "seconds": 1,
+    "m": 60, "minute": 60, "minutes": 60,
+    "h": 3600, "hour": 3600, "hours": 3600,
+    "d": 86400, "day": 86400, "days": 86400,
+    "w": 604800, "week": 604800, "weeks": 604800,
+}
+
+
+# Single worker: rotated files are zipped one at a time, off the writer threads
+_compression_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="log-compress")
+
+
+def zip_file(path: str) -> None:
+    """
+    Zip a rotated log file and remove the original
+
+    Args:
+        path: Path of the rotated log file
+    """
+    source = Path(path)
+    with zipfile.ZipFile(f"{source}.zip", "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.write(source, source.name)
+    source.unlink()
+
+
+def parse_size(value: str) -> int:
+    """
+    Parse a size string as used by LOG_ROTATION
+
+    Only sizes are accepted: time-based rotations ("1 day", "00:00") are
+    not supported by BatchedFileSink.
+
+    Args:
+        value: Size string (e.g., "10 MB", "512 KiB")
+
+    Returns:
+        Size in bytes
+    """
+    match = _SIZE_PATTERN.match(value)
+    if not match:
+        raise ValueError(f"Invalid size: {value!r}")
+    number, unit, binary = match.groups()
+    base = 1024 if binary else 1000
+    power = " kmg".index(unit.lower() or " ")
+    return int(float(number) * base ** power)
+
+
+def parse_duration(value: str) -> float:
+    """
+    Parse a duration string as used by LOG_RETENTION
+
+    Args:
+        value: Duration string (e.g., "30 days", "12 hours")
+
+    Returns:
+        Duration in seconds
+    """
+    match = _DURATION_PATTERN.match(value)
+    if not match or match.group(2).lower() not in _DURATION_UNITS:
+        raise ValueError(f"Invalid duration: {value!r}")
+    number, unit = match.groups()
+    return float(number) * _DURATION_UNITS[unit.lower()]
+
+
+class BatchedFileSink:
+    """
+    Loguru sink that buffers formatted records in memory and writes them in
+    batches, so a burst of records costs one write() instead of one per record
+
+    The buffer is flushed by a daemon thread every `flush_interval` seconds,
+    or as soon as it holds more than `max_buffer_bytes`. Size-based rotation
+    and age-based retention follow the LOG_ROTATION / LOG_RETENTION settings;
+    rotated files are zipped on the compression worker thread.
+
+    Usage:
+        logger.add(BatchedFileSink("logs/app.log", rotation="10 MB"), enqueue=False)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        rotation: Optional[str] = None,
+        retention: Optional[str] = None,
+        compression: bool = True,
+        flush_interval: float = 0.1,
+        max_buffer_bytes: int = 256 * 1024,
+    ):
+        self.path = Path(path)
+        self.rotation_bytes = parse_size(rotation) if rotation else None
+        self.retention_seconds = parse_duration(retention) if retention else None
+        self.compression = compression
+        self.flush_interval = flush_interval
+        self.max_buffer_bytes = max_buffer_bytes
+
+        self._buffer: List[str] = []
+        self._buffer_bytes = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._pending_compression: Optional[Future] = None
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+        self._thread = threading.Thread(
+            target=self._flush_loop,
+            name=f"log-flush-{self.path.name}",
+            daemon=True
+        )
+        self._thread.start()
+
+    def write(self, message: str) -> None:
+        """Buffer a formatted record (called by Loguru for each message)"""
+        with self._lock:
+            self._buffer.append(message)
+            self._buffer_bytes += len(message)
+            full = self._buffer_bytes >= self.max_buffer_bytes
+
+        if full:
+            self._wakeup.set()
+
+    def stop(self) -> None:
+        """Flush pending records and close the file (called by logger.remove)"""
+        self._stopping = True
+        self._wakeup.set()
+        self._thread.join()
+        self._file.close()
+
+        if self._pending_compression is not None:
+            self._pending_compression.result()
+
+    def _flush_loop(self) -> None:
+        """Background thread - flush the buffer periodically or when full"""
+        while not self._stopping:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self._flush_buffer()
+
+        self._flush_buffer()
+
+    def _flush_buffer(self) -> None:
+        """Write all buffered records with a single write() call"""
+        with self._lock:
+            if not self._buffer:
+                return
+            chunk = "".join(self._buffer)
+            self._buffer.clear()
+            self._buffer_bytes = 0
+
+        try:
+            self._file.write(chunk)
+            self._file.flush()
+
+            if self.rotation_bytes and self._file.tell() >= self.rotation_bytes:
+                self._rotate()
+        except Exception as e:
+            # A sink must never raise into the logging call site: report on
+            # stderr like Loguru's own sink error handler
+            sys.stderr.write(f"BatchedFileSink error on {self.path}: {e}\n")
+            sys.stderr.flush()
+
+    def _rotate(self) -> None:
+        """Rename the current file with a timestamp and start a new one"""
+        self._file.close()
+
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S_%f")
+        rotated = self.path.with_name(f"{self.path.stem}.{timestamp}{self.path.suffix}")
+        try:
+            os.rename(self.path, rotated)
+        finally:
+            # Reopen even if the rename failed: a failed rotation must not
+            # leave the sink writing to a closed file
+            self._file = open(self.path, "a", encoding="utf-8")
+
+        # Compression and retention run on the worker: the flush thread only
+        # pays for the rename
+        self._pending_compression = _compression_executor.submit(
+            self._finalize_rotated, rotated
+        )
+
+    def _finalize_rotated(self, rotated: Path) -> None:
+        """Compress a rotated file then apply retention (compression worker)"""
+        if self.compression:
+            zip_file(str(rotated))
+        if self.retention_seconds:
+            self._apply_retention()
+
+    def _apply_retention(self) -> None:
+        """Delete rotated files older than the retention period"""
+        cutoff = time.time() - self.retention_seconds
+        for rotated in self.path.parent.glob(f"{self.path.stem}.*"):
+            if rotated != self.path and rotated.stat().st_mtime < cutoff:
+                rotated.unlink(missing_ok=True)
@@ -1,6 +1,7 @@
 """
 Domain Monitor - FastAPI Main Application
 """
+import asyncio
 import sys
 from contextlib import asynccontextmanager
 from pathlib import Path
@@ -12,50 +13,53 @@ from loguru import logger
 
 from app.config import settings
 from app.database import init_db, close_db
+from app.log_sink import BatchedFileSink
 from app.routers import domains
-from app.services.scheduler import scheduler_service
-from app.services.watcher import watcher_service
 
 
 # ============================================
 # CONFIGURE LOGURU
 # ============================================
 
+LOG_FORMAT = "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}"
+
+
 def configure_logging():
     """Configure Loguru logging with file rotation and console output"""
 
     # Remove default handler
     logger.remove()
 
-    # Console handler (colored output)
-    logger.add(
-        sys.stdout,
-        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
-        level=settings.log_level,
-        colorize=True
-    )
-
-    # File handler (with rotation)
-    logger.add(
-        f"{settings.log_path}/app.log",
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
-        level=settings.log_level,
-        rotation=settings.log_rotation,
-        retention=settings.log_retention,
-        compression="zip",
-        enqueue=True  # Thread-safe
-    )
-
-    # Error file handler (errors only)
-    logger.add(
-        f"{settings.log_path}/error.log",
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
-        level="ERROR",
-        rotation=settings.log_rotation,
-        retention=settings.log_retention,
-        compression="zip",
-        enqueue=True
-    )
+    if settings.app_env == "production":
+        # Console handler (plain output: stdout is piped to the container logs)
+        logger.add(
+            sys.stdout,
+            format=LOG_FORMAT,
+            level=settings.log_level,
+            colorize=False
+        )
+    else:
+        # Console handler (colored output)
+        logger.add(
+            sys.stdout,
+            format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
+            level=settings.log_level,
+            colorize=True
+        )
+
+    # File handlers (batched writes + rotation, flushed by a background
+    # thread): app.log gets everything, error.log errors only
+    for filename, level in (("app.log", settings.log_level), ("error.log", "ERROR")):
+        logger.add(
+            BatchedFileSink(
+                f"{settings.log_path}/{filename}",
+                rotation=settings.log_rotation,
+                retention=settings.log_retention,
+            ),
+            format=LOG_FORMAT,
+            level=level,
+            enqueue=False  # The sink buffers and writes off the calling thread
+        )
 
     logger.info("✅ Logging configured successfully")
 
@@ -76,8 +80,15 @@ async def lifespan(app: FastAPI):
 
     Shutdown:
         - Stop scheduler
+        - Close HTTP client
         - Close database connections
     """
+    # Service modules pull in APScheduler, dnspython and httpx: import them
+    # here so that importing app.main stays cheap
+    from app.services.notification import notification_service
+    from app.services.scheduler import scheduler_service
+    from app.services.watcher import watcher_service
+
     # ========== STARTUP ==========
     logger.info("=" * 80)
     logger.info("🚀 Starting Domain Monitor Application")
@@ -87,13 +98,15 @@ async def lifespan(app: FastAPI):
     configure_logging()
 
     # Log configuration
-    logger.info(f"📋 Configuration:")
-    logger.info(f"   - Environment: {settings.app_env}")
-    logger.info(f"   - Debug: {settings.app_debug}")
-    logger.info(f"   - Host: {settings.app_host}:{settings.app_port}")
-    logger.info(f"   - Database: {settings.mysql_host}:{settings.mysql_port}/{settings.mysql_database}")
-    logger.info(f"   - Check interval: {settings.check_interval_hours} hour(s)")
-    logger.info(f"   - Supported TLDs: {', '.join(settings.supported_tlds_list)}")
+    logger.info("📋 Configuration:")
+    logger.info("   - Environment: {}", settings.app_env)
+    logger.info("   - Debug: {}", settings.app_debug)
+    logger.info("   - Host: {}:{}", settings.app_host, settings.app_port)
+    logger.info("   - Database: {}:{}/{}", settings.mysql_host, settings.mysql_port, settings.mysql_database)
+    logger.info("   - Check interval: {} hour(s)", settings.check_interval_hours)
+    logger.info("   - Supported TLDs: {}", ', '.join(settings.supported_tlds_list))
+    # uvloop when installed (uvicorn --loop auto), asyncio otherwise
+    logger.info("   - Event loop: {}", type(asyncio.get_running_loop()).__module__)
 
     # Initialize database
     try:
@@ -101,7 +114,7 @@ async def lifespan(app: FastAPI):
         await init_db()
         logger.success("✅ Database initialized successfully")
     except Exception as e:
-        logger.error(f"❌ Failed to initialize database: {str(e)}")
+        logger.error("❌ Failed to initialize database: {}", e)
         raise
 
     # Start scheduler
@@ -110,9 +123,12 @@ async def lifespan(app: FastAPI):
         scheduler_service.start_scheduler()
         logger.success("✅ Scheduler started successfully")
     except Exception as e:
-        logger.error(f"❌ Failed to start scheduler: {str(e)}")
+        logger.error("❌ Failed to start scheduler: {}", e)
         raise
 
+    # Pre-resolve the Discord webhook host
+    notification_service.start_dns_refresh()
+
     logger.info("=" * 80)
     logger.success("✅ Application started successfully")
     logger.info("=" * 80)
@@ -130,7 +146,7 @@ async def lifespan(app: FastAPI):
         await watcher_service.stop_all_watchers()
         logger.success("✅ All watchers stopped successfully")
     except Exception as e:
-        logger.error(f"❌ Error stopping watchers: {str(e)}")
+        logger.error("❌ Error stopping watchers: {}", e)
 
     # Stop scheduler
     try:
@@ -138,7 +154,14 @@ async def lifespan(app: FastAPI):
         scheduler_service.shutdown_scheduler()
         logger.success("✅ Scheduler stopped successfully")
     except Exception as e:
-        logger.error(f"❌ Error stopping scheduler: {str(e)}")
+        logger.error("❌ Error stopping scheduler: {}", e)
+
+    # Close HTTP client
+    try:
+        await notification_service.aclose()
+        logger.success("✅ HTTP client closed")
+    except Exception as e:
+        logger.error("❌ Error closing HTTP client: {}", e)
 
     # Close database
     try:
@@ -146,7 +169,7 @@ async def lifespan(app: FastAPI):
         await close_db()
         logger.success("✅ Database connections closed")
     except Exception as e:
-        logger.error(f"❌ Error closing database: {str(e)}")
+        logger.error("❌ Error closing database: {}", e)
 
     logger.info("=" * 80)
     logger.success("✅ Application shutdown complete")
@@ -171,13 +194,16 @@ app = FastAPI(
 # CORS MIDDLEWARE (Optional)
 # ============================================
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # In production, specify exact origins
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# The frontend is served from this app (same origin): cross-origin access is
+# only needed in development, so production skips the middleware entirely
+if settings.app_env != "production":
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE"],
+        allow_headers=["Content-Type", "Authorization"],
+    )
 
 
 # ============================================
@@ -230,5 +256,6 @@ if __name__ == "__main__":
         host=settings.app_host,
         port=settings.app_port,
         reload=settings.app_debug,
-        log_level=settings.log_level.lower()
+        log_level=settings.log_level.lower(),
+        loop="auto"  # uvloop when installed
     )
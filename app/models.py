@@ -1,7 +1,7 @@
 """
 SQLAlchemy models for domain monitoring
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum, Text, ForeignKey, Index
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum, Text, ForeignKey, Index, CheckConstraint
 from sqlalchemy.sql import func
 from datetime import datetime
 import enum
@@ -32,19 +32,27 @@ class Domain(Base):
     niche = Column(String(100), nullable=True)
     traffic = Column(Integer, default=0)
     referring_domains = Column(Integer, default=0)
-    status = Column(Enum(DomainStatus), default=DomainStatus.UNKNOWN, index=True)
-    previous_status = Column(Enum(DomainStatus), default=DomainStatus.UNKNOWN)
+    # Plain strings holding DomainStatus values (no Enum type processing per row)
+    status = Column(String(16), default=DomainStatus.UNKNOWN.value, index=True)
+    previous_status = Column(String(16), default=DomainStatus.UNKNOWN.value)
     last_checked = Column(DateTime, nullable=True, index=True)
     last_available = Column(DateTime, nullable=True)
     is_active = Column(Boolean, default=True, index=True)
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
 
+    # Single-column indexes come from index=True on the columns above
     __table_args__ = (
-        Index('idx_is_active', 'is_active'),
-        Index('idx_status', 'status'),
-        Index('idx_tld', 'tld'),
-        Index('idx_last_checked', 'last_checked'),
+        # MySQL only: elsewhere it would be a b-tree duplicating ix_domains_domain
+        Index('ft_domain', 'domain', mysql_prefix='FULLTEXT').ddl_if(dialect='mysql'),
+        CheckConstraint(
+            "status IN ('available', 'unavailable', 'unknown')",
+            name='ck_domains_status'
+        ),
+        CheckConstraint(
+            "previous_status IN ('available', 'unavailable', 'unknown')",
+            name='ck_domains_previous_status'
+        ),
     )
 
 
@@ -61,12 +69,6 @@ class CheckLog(Base):
     notification_sent = Column(Boolean, default=False)
     checked_at = Column(DateTime, default=func.now(), index=True)
 
-    __table_args__ = (
-        Index('idx_domain_id', 'domain_id'),
-        Index('idx_checked_at', 'checked_at'),
-        Index('idx_status_found', 'status_found'),
-    )
-
 
 class Notification(Base):
     """Log of Discord notifications sent"""
@@ -78,9 +80,3 @@ class Notification(Base):
     http_status = Column(Integer, nullable=True)
     success = Column(Boolean, default=False, index=True)
     sent_at = Column(DateTime, default=func.now(), index=True)
-
-    __table_args__ = (
-        Index('idx_domain_id', 'domain_id'),
-        Index('idx_sent_at', 'sent_at'),
-        Index('idx_success', 'success'),
-    )
@@ -1,12 +1,19 @@
 """
 Domain API Routes - CRUD operations and domain management
 """
+import re
+import time
+from functools import lru_cache
 from typing import List, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select, func, delete
+from sqlalchemy import select, func, delete, case, lambda_stmt
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.lambdas import StatementLambdaElement
 from loguru import logger
+from pydantic import TypeAdapter
 
 from app.database import get_db
 from app.models import Domain, CheckLog, Notification, DomainStatus
@@ -20,16 +27,112 @@ from app.schemas import (
     StatsResponse,
     HealthResponse
 )
-from app.config import settings
-from app.services.availability import availability_service
-from app.services.notification import notification_service
-from app.services.scheduler import scheduler_service
-from app.services.dns_checker import dns_checker
-from app.services.watcher import watcher_service
+from app.config import Settings, get_settings
 
 
 router = APIRouter(prefix="/api", tags=["domains"])
 
+# One validator call per page instead of one model_validate() per row
+_DOMAIN_LIST_ADAPTER = TypeAdapter(List[DomainResponse])
+_CHECK_LOG_LIST_ADAPTER = TypeAdapter(List[CheckLogResponse])
+
+# Valid values of the status query parameter
+_STATUS_VALUES = frozenset(s.value for s in DomainStatus)
+
+# Separators and MySQL boolean-mode operators, stripped from search words
+_SEARCH_SEPARATORS = re.compile(r'[.+\-<>()~*"@\s]+')
+
+# InnoDB does not index words shorter than innodb_ft_min_token_size (3)
+_FULLTEXT_MIN_WORD_LENGTH = 3
+
+# InnoDB's default stopword list (INFORMATION_SCHEMA.INNODB_FT_DEFAULT_STOPWORD):
+# never indexed, so a required "+com*" could only match other words
+_FULLTEXT_STOPWORDS = frozenset((
+    "a", "about", "an", "are", "as", "at", "be", "by", "com", "de", "en",
+    "for", "from", "how", "i", "in", "is", "it", "la", "of", "on", "or",
+    "that", "the", "this", "to", "was", "what", "when", "where", "who",
+    "will", "with", "und", "www",
+))
+
+
+@lru_cache(maxsize=1)
+def _utc_midnight(day_number: int) -> datetime:
+    """
+    Get UTC midnight of a day (naive, like the stored timestamps)
+
+    Args:
+        day_number: Days since the Unix epoch (time.time() // 86400)
+
+    Returns:
+        Start of that day in UTC
+    """
+    return datetime.fromtimestamp(day_number * 86400, timezone.utc).replace(tzinfo=None)
+
+
+def _apply_domain_filters(
+    stmt: StatementLambdaElement,
+    status: Optional[str],
+    tld: Optional[str],
+    is_active: Optional[bool],
+    search: Optional[str],
+    dialect_name: str
+) -> StatementLambdaElement:
+    """
+    Append the list_domains WHERE criteria to a lambda statement
+
+    Each criterion is its own lambda, so the compiled SQL is cached per
+    combination of active filters and the values travel as bound parameters.
+
+    Args:
+        stmt: Lambda statement selecting from domains
+        status: Status value (already validated)
+        tld: TLD filter
+        is_active: Monitoring status filter
+        search: Search term typed by the user
+        dialect_name: Database dialect of the session
+
+    Returns:
+        Statement with the filters applied. On MySQL the search uses MATCH
+        ... AGAINST on the ft_domain FULLTEXT index: each word of the term
+        must start a word of the domain, so "exam" finds example.fr but
+        "ample" does not. Short words and stopwords ("com", "www") are not
+        indexed: they are left out of MATCH and the full term is also
+        required as a substring (LIKE). Without any indexable word, and on
+        other dialects, the search is a LIKE '%term%' scan
+    """
+    if status:
+        stmt += lambda s: s.where(Domain.status == status)
+
+    if tld:
+        tld = tld.lower()
+        stmt += lambda s: s.where(Domain.tld == tld)
+
+    if is_active is not None:
+        stmt += lambda s: s.where(Domain.is_active == is_active)
+
+    if search:
+        search = search.lower()
+        words = [w for w in _SEARCH_SEPARATORS.split(search) if w]
+        indexed = [
+            w for w in words
+            if len(w) >= _FULLTEXT_MIN_WORD_LENGTH and w not in _FULLTEXT_STOPWORDS
+        ]
+
+        if dialect_name == "mysql" and indexed:
+            against = " ".join(f"+{w}*" for w in indexed)
+            if len(indexed) == len(words):
+                stmt += lambda s: s.where(match(Domain.domain, against=against).in_boolean_mode())
+            else:
+                # The index narrows the rows, the LIKE checks the dropped words
+                stmt += lambda s: s.where(
+                    match(Domain.domain, against=against).in_boolean_mode(),
+                    Domain.domain.contains(search)
+                )
+        else:
+            stmt += lambda s: s.where(Domain.domain.contains(search))
+
+    return stmt
+
 
 # ============================================
 # HEALTH & STATS ENDPOINTS
@@ -48,7 +151,7 @@ async def health_check(db: AsyncSession = Depends(get_db)):
         await db.execute(select(1))
         database_status = "connected"
     except Exception as e:
-        logger.error(f"Database health check failed: {str(e)}")
+        logger.error("Database health check failed: {}", e)
         database_status = "disconnected"
 
     return HealthResponse(
@@ -66,41 +169,42 @@ async def get_stats(db: AsyncSession = Depends(get_db)):
     Returns:
         Statistics about domains, checks, and notifications
     """
-    # Total domains
-    total_result = await db.execute(select(func.count(Domain.id)))
-    total_domains = total_result.scalar()
-
-    # Active domains
-    active_result = await db.execute(
-        select(func.count(Domain.id)).where(Domain.is_active == True)
-    )
-    active_domains = active_result.scalar()
-
-    # By status
-    status_result = await db.execute(
-        select(Domain.status, func.count(Domain.id))
-        .group_by(Domain.status)
-    )
-    by_status = {status.value: count for status, count in status_result.all()}
-
-    # By TLD
-    tld_result = await db.execute(
-        select(Domain.tld, func.count(Domain.id))
-        .group_by(Domain.tld)
+    from app.services.scheduler import scheduler_service
+    from app.services.watcher import watcher_service
+
+    # Domain counters in one round-trip: one row per (status, TLD) pair,
+    # folded into the totals below
+    domain_result = await db.execute(
+        select(
+            Domain.status,
+            Domain.tld,
+            func.count(Domain.id),
+            func.sum(case((Domain.is_active == True, 1), else_=0)),
+            func.max(Domain.last_checked)
+        )
+        .group_by(Domain.status, Domain.tld)
     )
-    by_tld = {tld: count for tld, count in tld_result.all()}
 
-    # Last check cycle (most recent last_checked)
-    last_check_result = await db.execute(
-        select(func.max(Domain.last_checked))
-    )
-    last_check_cycle = last_check_result.scalar()
+    total_domains = 0
+    active_domains = 0
+    by_status = {}
+    by_tld = {}
+    last_check_cycle = None
+
+    for status, tld, count, active, last_checked in domain_result.all():
+        total_domains += count
+        active_domains += active or 0
+        by_status[status] = by_status.get(status, 0) + count
+        by_tld[tld] = by_tld.get(tld, 0) + count
+        # Most recent last_checked
+        if last_checked is not None and (last_check_cycle is None or last_checked > last_check_cycle):
+            last_check_cycle = last_checked
 
     # Next check cycle
     next_check_cycle = scheduler_service.get_next_run_time()
 
     # Notifications today
-    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    today_start = _utc_midnight(int(time.time()) // 86400)
     notif_result = await db.execute(
         select(func.count(Notification.id))
         .where(Notification.sent_at >= today_start)
@@ -155,31 +259,24 @@ async def list_domains(
     Returns:
         Paginated list of domains
     """
-    # Build query
-    query = select(Domain)
+    if status and status not in _STATUS_VALUES:
+        raise HTTPException(status_code=400, detail=f"Invalid status: {status}")
 
-    # Apply filters
-    if status:
-        try:
-            status_enum = DomainStatus(status)
-            query = query.where(Domain.status == status_enum)
-        except ValueError:
-            raise HTTPException(status_code=400, detail=f"Invalid status: {status}")
-
-    if tld:
-        query = query.where(Domain.tld == tld.lower())
-
-    if is_active is not None:
-        query = query.where(Domain.is_active == is_active)
+    dialect_name = db.get_bind().dialect.name
 
-    if search:
-        query = query.where(Domain.domain.contains(search.lower()))
-
-    # Count total
-    count_query = select(func.count()).select_from(query.subquery())
+    # Count total directly on the table (no derived table to materialize)
+    count_query = _apply_domain_filters(
+        lambda_stmt(lambda: select(func.count(Domain.id))),
+        status, tld, is_active, search, dialect_name
+    )
     total_result = await db.execute(count_query)
     total = total_result.scalar()
 
+    query = _apply_domain_filters(
+        lambda_stmt(lambda: select(Domain)),
+        status, tld, is_active, search, dialect_name
+    )
+
     # Apply sorting
     if sort_by == "domain":
         sort_column = Domain.domain
@@ -189,12 +286,12 @@ async def list_domains(
         sort_column = Domain.created_at
 
     if sort_order == "asc":
-        query = query.order_by(sort_column.asc())
+        query += lambda s: s.order_by(sort_column.asc())
     else:
-        query = query.order_by(sort_column.desc())
+        query += lambda s: s.order_by(sort_column.desc())
 
     # Apply pagination
-    query = query.limit(limit).offset(offset)
+    query += lambda s: s.limit(limit).offset(offset)
 
     # Execute
     result = await db.execute(query)
@@ -204,7 +301,7 @@ async def list_domains(
         total=total,
         limit=limit,
         offset=offset,
-        domains=[DomainResponse.model_validate(d) for d in domains]
+        domains=_DOMAIN_LIST_ADAPTER.validate_python(domains, from_attributes=True)
     )
 
 
@@ -219,33 +316,35 @@ async def get_domain(domain_id: int, db: AsyncSession = Depends(get_db)):
     Returns:
         Domain details with 10 most recent checks
     """
-    # Get domain
-    result = await db.execute(select(Domain).where(Domain.id == domain_id))
-    domain = result.scalar_one_or_none()
-
-    if not domain:
-        raise HTTPException(status_code=404, detail="Domain not found")
-
-    # Get recent checks (last 10)
-    checks_result = await db.execute(
-        select(CheckLog)
-        .where(CheckLog.domain_id == domain_id)
+    # Get domain and its recent checks (last 10) in one round-trip: the
+    # outer join still returns the domain row when it has no checks
+    result = await db.execute(
+        select(Domain, CheckLog)
+        .outerjoin(CheckLog, CheckLog.domain_id == Domain.id)
+        .where(Domain.id == domain_id)
         .order_by(CheckLog.checked_at.desc())
         .limit(10)
     )
-    checks = checks_result.scalars().all()
+    rows = result.all()
+
+    if not rows:
+        raise HTTPException(status_code=404, detail="Domain not found")
+
+    domain = rows[0][0]
+    checks = [check for _, check in rows if check is not None]
 
     # Build response
-    domain_dict = DomainResponse.model_validate(domain).model_dump()
-    domain_dict["recent_checks"] = [CheckLogResponse.model_validate(c) for c in checks]
+    response = DomainWithLogs.model_validate(domain)
+    response.recent_checks = _CHECK_LOG_LIST_ADAPTER.validate_python(checks, from_attributes=True)
 
-    return DomainWithLogs(**domain_dict)
+    return response
 
 
 @router.post("/domains", response_model=DomainResponse, status_code=201)
 async def create_domain(
     domain_data: DomainCreate,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    settings: Settings = Depends(get_settings)
 ):
     """
     Create a new domain to monitor
@@ -256,24 +355,18 @@ async def create_domain(
     Returns:
         Created domain
     """
-    # Validate TLD
-    if not dns_checker.is_supported_tld(domain_data.domain):
-        tld = dns_checker.extract_tld(domain_data.domain)
+    from app.services.dns_checker import dns_checker
+    from app.services.notification import notification_service
+    from app.services.watcher import watcher_service
+
+    # Validate TLD (domain is already lowercased by DomainCreate)
+    tld = domain_data.domain[domain_data.domain.rfind('.') + 1:]
+    if tld not in settings.supported_tlds_set:
         raise HTTPException(
             status_code=400,
             detail=f"TLD '{tld}' is not supported. Supported TLDs: {', '.join(settings.supported_tlds_list)}"
         )
 
-    # Check if domain already exists
-    existing = await db.execute(
-        select(Domain).where(Domain.domain == domain_data.domain.lower())
-    )
-    if existing.scalar_one_or_none():
-        raise HTTPException(status_code=409, detail="Domain already exists")
-
-    # Extract TLD
-    tld = dns_checker.extract_tld(domain_data.domain)
-
     # Create domain
     domain = Domain(
         domain=domain_data.domain.lower(),
@@ -281,19 +374,25 @@ async def create_domain(
         niche=domain_data.niche,
         traffic=domain_data.traffic or 0,
         referring_domains=domain_data.referring_domains or 0,
-        status=DomainStatus.UNKNOWN,
-        previous_status=DomainStatus.UNKNOWN,
+        status=DomainStatus.UNKNOWN.value,
+        previous_status=DomainStatus.UNKNOWN.value,
         is_active=True
     )
 
+    # Single INSERT: the unique index on domains.domain rejects duplicates,
+    # no SELECT beforehand (and no race between the check and the insert)
     db.add(domain)
-    await db.commit()
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Domain already exists")
     await db.refresh(domain)
 
-    logger.info(f"✅ Created new domain: {domain.domain} (ID: {domain.id})")
+    logger.info("✅ Created new domain: {} (ID: {})", domain.domain, domain.id)
 
     # IMMEDIATE CHECK upon domain creation
-    logger.info(f"🔍 Starting immediate check for new domain: {domain.domain}")
+    logger.info("🔍 Starting immediate check for new domain: {}", domain.domain)
 
     try:
         # Get appropriate DNS server for TLD
@@ -307,10 +406,10 @@ async def create_domain(
 
         # Update domain status
         if check_result.available:
-            logger.success(f"🎯 Domain {domain.domain} is AVAILABLE!")
+            logger.success("🎯 Domain {} is AVAILABLE!", domain.domain)
 
-            domain.status = DomainStatus.AVAILABLE
-            domain.previous_status = DomainStatus.UNKNOWN
+            domain.status = DomainStatus.AVAILABLE.value
+            domain.previous_status = DomainStatus.UNKNOWN.value
             domain.last_checked = datetime.utcnow()
             domain.last_available = datetime.utcnow()
             await db.commit()
@@ -319,18 +418,18 @@ async def create_domain(
             await notification_service.send_discord_notification(domain, db)
 
             # START WATCHER (checks every 2 seconds)
-            await watcher_service.start_watcher(domain.id, domain.domain)
-            logger.success(f"👁️ Watcher started for {domain.domain} - checking every 2 seconds")
+            await watcher_service.start_watcher(domain.id, domain.domain, domain.tld)
+            logger.success("👁️ Watcher started for {} - checking every 2 seconds", domain.domain)
 
         else:
-            logger.info(f"❌ Domain {domain.domain} is UNAVAILABLE")
-            domain.status = DomainStatus.UNAVAILABLE
-            domain.previous_status = DomainStatus.UNKNOWN
+            logger.info("❌ Domain {} is UNAVAILABLE", domain.domain)
+            domain.status = DomainStatus.UNAVAILABLE.value
+            domain.previous_status = DomainStatus.UNKNOWN.value
             domain.last_checked = datetime.utcnow()
             await db.commit()
 
     except Exception as e:
-        logger.error(f"Error during immediate check: {str(e)}")
+        logger.error("Error during immediate check: {}", e)
 
     await db.refresh(domain)
     return DomainResponse.model_validate(domain)
@@ -368,9 +467,10 @@ async def update_domain(
         domain.referring_domains = domain_data.referring_domains
 
     await db.commit()
-    await db.refresh(domain)
+    # Other fields are current in memory, only reload the server-side updated_at
+    await db.refresh(domain, attribute_names=["updated_at"])
 
-    logger.info(f"✅ Updated domain: {domain.domain} (ID: {domain.id})")
+    logger.info("✅ Updated domain: {} (ID: {})", domain.domain, domain.id)
 
     return DomainResponse.model_validate(domain)
 
@@ -383,6 +483,8 @@ async def delete_domain(domain_id: int, db: AsyncSession = Depends(get_db)):
     Args:
         domain_id: Domain ID
     """
+    from app.services.watcher import watcher_service
+
     # Get domain
     result = await db.execute(select(Domain).where(Domain.id == domain_id))
     domain = result.scalar_one_or_none()
@@ -392,11 +494,14 @@ async def delete_domain(domain_id: int, db: AsyncSession = Depends(get_db)):
 
     domain_name = domain.domain
 
+    # Stop watching it first (the watcher would otherwise outlive the row)
+    await watcher_service.stop_watcher(domain_id)
+
     # Delete (cascade will handle check_logs and notifications)
     await db.execute(delete(Domain).where(Domain.id == domain_id))
     await db.commit()
 
-    logger.info(f"🗑️ Deleted domain: {domain_name} (ID: {domain_id})")
+    logger.info("🗑️ Deleted domain: {} (ID: {})", domain_name, domain_id)
 
 
 @router.post("/domains/{domain_id}/check", response_model=DomainResponse)
@@ -410,6 +515,10 @@ async def force_check(domain_id: int, db: AsyncSession = Depends(get_db)):
     Returns:
         Updated domain after check
     """
+    from app.services.availability import availability_service
+    from app.services.dns_checker import dns_checker
+    from app.services.notification import notification_service
+
     # Get domain
     result = await db.execute(select(Domain).where(Domain.id == domain_id))
     domain = result.scalar_one_or_none()
@@ -417,23 +526,30 @@ async def force_check(domain_id: int, db: AsyncSession = Depends(get_db)):
     if not domain:
         raise HTTPException(status_code=404, detail="Domain not found")
 
-    logger.info(f"🔍 Forcing check for domain: {domain.domain}")
+    logger.info("🔍 Forcing check for domain: {}", domain.domain)
 
-    # Verify domain
-    verification_result = await availability_service.verify_domain(domain, db)
+    # A forced check must query DNS, not reuse a cached answer
+    dns_checker.invalidate(domain.domain)
 
-    # Save check logs
+    # Verify domain and save check logs in a single transaction
+    verification_result = await availability_service.verify_domain(
+        domain, db, commit=False
+    )
     await availability_service.save_check_logs(
         domain_id=domain.id,
         check_logs=verification_result.check_logs,
-        db=db
+        db=db,
+        commit=False
     )
+    await db.commit()
 
-    # Send notification if needed
+    # Send notification if needed (outside the transaction)
     if verification_result.should_notify:
         await notification_service.send_discord_notification(domain, db)
 
-    await db.refresh(domain)
+    # Status fields are already set in memory, only reload the
+    # server-generated updated_at
+    await db.refresh(domain, attribute_names=["updated_at"])
 
     return DomainResponse.model_validate(domain)
 
@@ -460,9 +576,10 @@ async def toggle_monitoring(domain_id: int, db: AsyncSession = Depends(get_db)):
     domain.is_active = not domain.is_active
 
     await db.commit()
-    await db.refresh(domain)
+    # Other fields are current in memory, only reload the server-side updated_at
+    await db.refresh(domain, attribute_names=["updated_at"])
 
     status = "activated" if domain.is_active else "deactivated"
-    logger.info(f"🔄 Monitoring {status} for domain: {domain.domain}")
+    logger.info("🔄 Monitoring {} for domain: {}", status, domain.domain)
 
     return DomainResponse.model_validate(domain)
@@ -3,15 +3,15 @@ Availability Service - Orchestrate domain verification with double-check logic
 """
 import asyncio
 from dataclasses import dataclass
-from typing import Optional, List
+from typing import Optional, List, Union
 from datetime import datetime
-from sqlalchemy import select
+from sqlalchemy import select, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from loguru import logger
 
 from app.config import settings
 from app.models import Domain, CheckLog, DomainStatus, CheckStatus
-from app.services.dns_checker import dns_checker
+from app.services.dns_checker import CheckResult, dns_checker
 
 
 @dataclass
@@ -24,6 +24,41 @@ class VerificationResult:
     new_status: str
 
 
+@dataclass(slots=True)
+class DomainView:
+    """
+    Plain copy of the Domain columns read and written by verification
+
+    Used by the check cycle instead of ORM instances: attribute access skips
+    SQLAlchemy's instrumentation and the rows stay out of the identity map.
+    Field names match the Domain columns, so verify_domain accepts either.
+    """
+    id: int
+    domain: str
+    tld: str
+    status: str
+    previous_status: str
+    last_checked: Optional[datetime] = None
+    last_available: Optional[datetime] = None
+
+    def changes(self) -> dict:
+        """
+        Column values to persist after verification
+
+        Returns:
+            Dict keyed by column name, including the primary key
+        """
+        values = {
+            "id": self.id,
+            "status": self.status,
+            "previous_status": self.previous_status,
+            "last_checked": self.last_checked,
+        }
+        if self.last_available is not None:
+            values["last_available"] = self.last_available
+        return values
+
+
 class AvailabilityService:
     """Service for verifying domain availability with double-check"""
 
@@ -31,18 +66,41 @@ class AvailabilityService:
         self.double_check_delay = settings.double_check_delay_seconds
         self.primary_dns = settings.dns_primary_server
         self.secondary_dns = settings.dns_secondary_server
+        self.parallel_double_check = settings.parallel_double_check
+
+    def _build_check_log(self, result: CheckResult) -> dict:
+        """
+        Build a check log entry from a DNS check result
+
+        Args:
+            result: DNS check result
+
+        Returns:
+            Dict of CheckLog column values (without domain_id)
+        """
+        return {
+            "status_found": CheckStatus.AVAILABLE if result.available else CheckStatus.UNAVAILABLE,
+            "check_method": result.method,
+            "response_time_ms": result.response_time_ms,
+            "error_message": result.error,
+            "notification_sent": False
+        }
 
     async def verify_domain(
         self,
-        domain: Domain,
-        db: AsyncSession
+        domain: Union[Domain, DomainView],
+        db: AsyncSession,
+        commit: bool = True
     ) -> VerificationResult:
         """
         Verify domain availability with double-check logic
 
         Args:
-            domain: Domain model instance
+            domain: Domain model instance, or DomainView (then commit must be
+                False and the caller persists the changes)
             db: Database session
+            commit: Commit the status update (False leaves it pending in
+                the caller's transaction)
 
         Returns:
             VerificationResult with availability status and notification flag
@@ -51,144 +109,243 @@ class AvailabilityService:
             1. Save previous_status
             2. First check with primary DNS
             3. If unavailable → return (no notification)
+               If available and already was → return (no double check)
             4. If available → wait 5s → second check with secondary DNS
+               (with parallel_double_check, both checks run at once, no wait)
             5. If both available → detect transition → determine if notify
         """
         check_logs = []
         previous_status = domain.status
 
-        logger.info(f"🔍 Starting verification for domain: {domain.domain}")
+        logger.debug("🔍 Starting verification for domain: {}", domain.domain)
 
         # ============================================
         # FIRST CHECK - Primary DNS
         # ============================================
-        logger.debug(f"First check for {domain.domain} using {self.primary_dns}")
+        result2: Optional[CheckResult] = None
+
+        if self.parallel_double_check:
+            # Query both servers at once: max(rtt1, rtt2) instead of
+            # rtt1 + delay + rtt2. The "both say available" rule still applies.
+            logger.debug(
+                "Parallel check for {} using "
+                "{} and {}",
+                domain.domain, self.primary_dns, self.secondary_dns
+            )
+            result1, result2 = await asyncio.gather(
+                dns_checker.check_domain_availability(domain.domain, self.primary_dns),
+                dns_checker.check_domain_availability(domain.domain, self.secondary_dns)
+            )
+        else:
+            logger.debug("First check for {} using {}", domain.domain, self.primary_dns)
 
-        result1 = await dns_checker.check_domain_availability(
-            domain.domain,
-            self.primary_dns
-        )
+            result1 = await dns_checker.check_domain_availability(
+                domain.domain,
+                self.primary_dns
+            )
 
-        # Log first check
-        check_logs.append({
-            "status_found": CheckStatus.AVAILABLE if result1.available else CheckStatus.UNAVAILABLE,
-            "check_method": result1.method,
-            "response_time_ms": result1.response_time_ms,
-            "error_message": result1.error,
-            "notification_sent": False
-        })
+        # Log first check (and second one when run in parallel)
+        check_logs.append(self._build_check_log(result1))
+        if result2 is not None:
+            check_logs.append(self._build_check_log(result2))
 
         # If domain is NOT available, stop here
         if not result1.available:
-            logger.info(f"❌ Domain {domain.domain} is UNAVAILABLE (first check)")
+            logger.info("❌ Domain {} is UNAVAILABLE (first check)", domain.domain)
 
             # Update domain status
             domain.previous_status = previous_status
-            domain.status = DomainStatus.UNAVAILABLE
+            domain.status = DomainStatus.UNAVAILABLE.value
             domain.last_checked = datetime.utcnow()
 
-            await db.commit()
+            if commit:
+                await db.commit()
 
             return VerificationResult(
                 is_available=False,
                 should_notify=False,
                 check_logs=check_logs,
-                previous_status=previous_status.value,
+                previous_status=previous_status,
                 new_status=DomainStatus.UNAVAILABLE.value
             )
 
+        # ============================================
+        # ALREADY AVAILABLE - No double check needed
+        # ============================================
+        # The double check only guards against false positives before a
+        # notification. A domain that was already available cannot trigger
+        # one, so the primary answer is enough.
+        if result2 is None and previous_status == DomainStatus.AVAILABLE.value:
+            logger.debug("🔕 Domain {} still available (double check skipped)", domain.domain)
+
+            now = datetime.utcnow()
+            domain.previous_status = previous_status
+            domain.last_checked = now
+            domain.last_available = now
+
+            if commit:
+                await db.commit()
+
+            return VerificationResult(
+                is_available=True,
+                should_notify=False,
+                check_logs=check_logs,
+                previous_status=previous_status,
+                new_status=DomainStatus.AVAILABLE.value
+            )
+
         # ============================================
         # DOUBLE CHECK - Wait + Secondary DNS
         # ============================================
-        logger.debug(
-            f"First check shows AVAILABLE, waiting {self.double_check_delay}s "
-            f"before second check..."
-        )
-        await asyncio.sleep(self.double_check_delay)
+        if result2 is None:
+            logger.debug(
+                "First check shows AVAILABLE, waiting {}s "
+                "before second check...",
+                self.double_check_delay
+            )
+            await asyncio.sleep(self.double_check_delay)
 
-        logger.debug(f"Second check for {domain.domain} using {self.secondary_dns}")
+            logger.debug("Second check for {} using {}", domain.domain, self.secondary_dns)
 
-        result2 = await dns_checker.check_domain_availability(
-            domain.domain,
-            self.secondary_dns
-        )
+            result2 = await dns_checker.check_domain_availability(
+                domain.domain,
+                self.secondary_dns
+            )
 
-        # Log second check
-        check_logs.append({
-            "status_found": CheckStatus.AVAILABLE if result2.available else CheckStatus.UNAVAILABLE,
-            "check_method": result2.method,
-            "response_time_ms": result2.response_time_ms,
-            "error_message": result2.error,
-            "notification_sent": False
-        })
+            # Log second check
+            check_logs.append(self._build_check_log(result2))
 
         # ============================================
         # ANALYZE RESULTS
         # ============================================
         if result2.available:
             # Both checks confirm availability
-            logger.success(f"✅ Domain {domain.domain} is AVAILABLE (double-checked)")
+            logger.success("✅ Domain {} is AVAILABLE (double-checked)", domain.domain)
 
             # Update domain status
             domain.previous_status = previous_status
-            domain.status = DomainStatus.AVAILABLE
-            domain.last_checked = datetime.utcnow()
-            domain.last_available = datetime.utcnow()
+            domain.status = DomainStatus.AVAILABLE.value
+            now = datetime.utcnow()
+            domain.last_checked = now
+            domain.last_available = now
 
             # ============================================
             # DETERMINE IF NOTIFICATION NEEDED (ANTI-SPAM)
             # ============================================
             should_notify = False
 
-            if previous_status != DomainStatus.AVAILABLE:
+            if previous_status != DomainStatus.AVAILABLE.value:
                 # TRANSITION DETECTED: unavailable/unknown → available
                 should_notify = True
                 logger.info(
-                    f"🔔 Transition detected for {domain.domain}: "
-                    f"{previous_status.value} → available (WILL NOTIFY)"
+                    "🔔 Transition detected for {}: "
+                    "{} → available (WILL NOTIFY)",
+                    domain.domain, previous_status
                 )
             else:
                 # Already was available, don't spam
                 logger.debug(
-                    f"🔕 Domain {domain.domain} was already available "
-                    f"(no notification needed)"
+                    "🔕 Domain {} was already available "
+                    "(no notification needed)",
+                    domain.domain
                 )
 
-            await db.commit()
+            if commit:
+                await db.commit()
 
             return VerificationResult(
                 is_available=True,
                 should_notify=should_notify,
                 check_logs=check_logs,
-                previous_status=previous_status.value,
+                previous_status=previous_status,
                 new_status=DomainStatus.AVAILABLE.value
             )
         else:
             # Second check says unavailable
             logger.warning(
-                f"⚠️ Domain {domain.domain} - conflicting results "
-                f"(first: available, second: unavailable) → marking UNAVAILABLE"
+                "⚠️ Domain {} - conflicting results "
+                "(first: available, second: unavailable) → marking UNAVAILABLE",
+                domain.domain
             )
 
             domain.previous_status = previous_status
-            domain.status = DomainStatus.UNAVAILABLE
+            domain.status = DomainStatus.UNAVAILABLE.value
             domain.last_checked = datetime.utcnow()
 
-            await db.commit()
+            if commit:
+                await db.commit()
 
             return VerificationResult(
                 is_available=False,
                 should_notify=False,
                 check_logs=check_logs,
-                previous_status=previous_status.value,
+                previous_status=previous_status,
                 new_status=DomainStatus.UNAVAILABLE.value
             )
 
+    async def verify_domains(
+        self,
+        domains: List[Union[Domain, DomainView]],
+        db: AsyncSession,
+        concurrency: int = 50,
+        stagger_seconds: float = 0.0,
+        commit: bool = True
+    ) -> List[Union[VerificationResult, Exception]]:
+        """
+        Verify several domains concurrently
+
+        Args:
+            domains: Domain model instances, or DomainViews (then commit
+                must be False and the caller persists the changes)
+            db: Database session shared by the verifications
+            concurrency: Maximum number of verifications in flight
+            stagger_seconds: Delay between two verification starts
+            commit: Commit once after all verifications (False leaves the
+                status updates pending in the caller's transaction)
+
+        Returns:
+            One VerificationResult or exception per domain, in the same order
+
+        Logic:
+            - Up to `concurrency` verify_domain calls run at once, so the
+              double-check delay of one domain overlaps the DNS queries of
+              the others
+            - Start times are staggered by stagger_seconds, so DNS servers
+              see the same query rate as with sequential checks
+            - verify_domain(commit=False) does no database I/O, so the
+              tasks can share the session
+            - A failing domain returns its exception instead of cancelling
+              the others; cancellation (shutdown) cancels every task of the
+              TaskGroup, none is left running
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def verify(index: int, domain: Union[Domain, DomainView]) -> Union[VerificationResult, Exception]:
+            await asyncio.sleep(index * stagger_seconds)
+            async with semaphore:
+                logger.debug("Checking domain: {}", domain.domain)
+                try:
+                    return await self.verify_domain(domain, db, commit=False)
+                except Exception as e:
+                    return e
+
+        async with asyncio.TaskGroup() as tg:
+            tasks = [
+                tg.create_task(verify(index, domain))
+                for index, domain in enumerate(domains)
+            ]
+
+        if commit:
+            await db.commit()
+
+        return [task.result() for task in tasks]
+
     async def save_check_logs(
         self,
         domain_id: int,
         check_logs: List[dict],
-        db: AsyncSession
+        db: AsyncSession,
+        commit: bool = True
     ) -> None:
         """
         Save check logs to database
@@ -197,17 +354,42 @@ class AvailabilityService:
             domain_id: Domain ID
             check_logs: List of check log dictionaries
             db: Database session
+            commit: Commit after inserting (False leaves the rows pending
+                in the caller's transaction)
         """
-        for log_data in check_logs:
-            check_log = CheckLog(
-                domain_id=domain_id,
-                **log_data
-            )
-            db.add(check_log)
+        await self.save_check_log_rows(
+            [{"domain_id": domain_id, **log_data} for log_data in check_logs],
+            db,
+            commit=commit
+        )
 
-        await db.commit()
-        logger.debug(f"Saved {len(check_logs)} check logs for domain_id={domain_id}")
+    async def save_check_log_rows(
+        self,
+        rows: List[dict],
+        db: AsyncSession,
+        commit: bool = True
+    ) -> None:
+        """
+        Save check logs of any number of domains with one INSERT
+
+        Args:
+            rows: Check log dictionaries, each including its domain_id
+            db: Database session
+            commit: Commit after inserting (False leaves the rows pending
+                in the caller's transaction)
+        """
+        if not rows:
+            return
 
+        # Core executemany: the driver sends a single multi-row INSERT
+        # instead of one statement per ORM object. No RETURNING: MySQL does
+        # not support it, and callers set notification_sent on the rows
+        # before inserting, so they never need the generated IDs.
+        await db.execute(insert(CheckLog), rows)
+
+        if commit:
+            await db.commit()
+        logger.debug("Saved {} check logs", len(rows))
 
 # Global instance
 availability_service = AvailabilityService()
@@ -1,24 +1,135 @@
 """
 DNS Checker Service - Verify domain availability using DNS queries
 """
+import asyncio
+import random
 import time
+from collections import OrderedDict
+from functools import lru_cache, partial
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Dict, FrozenSet, Hashable, List, Optional, Sequence, Set, Tuple
+import dns.asyncresolver
 import dns.resolver
 import dns.exception
 from loguru import logger
 from app.config import settings
 
+# c-ares (aiodns) keeps one UDP socket per server and multiplexes all
+# concurrent queries over it; fall back to dnspython when not installed
+try:
+    import aiodns
+    AIODNS_AVAILABLE = True
+except ImportError:
+    aiodns = None
+    AIODNS_AVAILABLE = False
 
-@dataclass
+
+# Authoritative DNS server per TLD (see DNSChecker.get_dns_server_for_tld)
+_TLD_DNS_MAP = {
+    "fr": "192.134.4.1",   # dns.nic.fr (AFNIC)
+    "com": "199.7.91.13",  # a.gtld-servers.net (Verisign)
+    "net": "199.7.91.13",  # a.gtld-servers.net (Verisign)
+}
+_DEFAULT_DNS_SERVER = "8.8.8.8"  # Google DNS
+_TLD_AUTHORITATIVE_SERVERS = frozenset(_TLD_DNS_MAP.values())
+
+# Upper bound of the first retry delay, doubled on each further attempt
+RETRY_BASE_DELAY = 0.5
+
+# Sibling-TLD prefetches running at once; more are dropped, not queued
+PREFETCH_CONCURRENCY = 4
+
+
+def _elapsed_ms(start_ns: int) -> int:
+    """
+    Milliseconds elapsed since a perf_counter_ns() reading
+
+    perf_counter is monotonic with the finest resolution available. Rounded
+    up: a sub-millisecond answer reports 1ms, not 0.
+
+    Args:
+        start_ns: perf_counter_ns() value taken before the query
+
+    Returns:
+        Elapsed time in whole milliseconds
+    """
+    return -(-(time.perf_counter_ns() - start_ns) // 1_000_000)
+
+
+@dataclass(slots=True, frozen=True)
 class CheckResult:
-    """Result of a DNS availability check"""
+    """
+    Result of a DNS availability check
+
+    Slotted (no per-instance __dict__) and frozen: cached results are
+    shared by every caller, none can alter them.
+    """
     available: bool
     method: str
     response_time_ms: int
     error: Optional[str] = None
 
 
+class TTLCache:
+    """In-process LRU cache whose entries expire after a fixed TTL"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Get a cached value
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None if missing or expired
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a value, evicting the least recently used entry when full
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Entry TTL, capped by the cache TTL (default: the cache TTL)
+        """
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """Remove an entry if present"""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
 class DNSChecker:
     """Service for checking domain availability via DNS"""
 
@@ -27,6 +138,99 @@ class DNSChecker:
         self.retry_count = settings.dns_retry_count
         self.primary_server = settings.dns_primary_server
         self.secondary_server = settings.dns_secondary_server
+        # Parsed and lowercased once from SUPPORTED_TLDS
+        self.supported_tlds: FrozenSet[str] = settings.supported_tlds_set
+
+        # Answers per (domain, server). "Resolved to IPs" (unavailable) answers
+        # are kept longer; NXDOMAIN (available) answers only briefly, less
+        # than a watcher tick, so that a watcher still sees a loss on its next
+        # check while concurrent checkers share one lookup. Timeouts and
+        # errors are never cached.
+        self.resolved_cache = TTLCache(
+            maxsize=settings.dns_cache_max_size,
+            ttl=settings.dns_cache_ttl_unavailable_seconds
+        )
+        self.nxdomain_cache = TTLCache(
+            maxsize=settings.dns_cache_max_size,
+            ttl=settings.dns_cache_ttl_available_seconds
+        )
+
+        # One async resolver per DNS server, built on first use
+        self._resolvers: Dict[str, Any] = {}
+
+        # Queries currently running, keyed by (domain, server)
+        self._inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+
+        # Max concurrent queries per (TLD, server), set by the scheduler calibration
+        self._limits: Dict[Tuple[str, str], asyncio.Semaphore] = {}
+
+        # Sibling-TLD prefetch (see _schedule_prefetch)
+        self.prefetch = settings.dns_prefetch_sibling_tlds
+        self._prefetch_slots = asyncio.Semaphore(PREFETCH_CONCURRENCY)
+        self._prefetch_tasks: Set[asyncio.Task] = set()
+
+    def set_concurrency_limit(self, tld: str, dns_server: str, limit: int) -> None:
+        """
+        Bound the number of concurrent DNS queries for a TLD on one server
+
+        Args:
+            tld: Top-level domain (e.g., 'fr')
+            dns_server: DNS server IP the limit applies to
+            limit: Max queries in flight for that TLD on that server
+        """
+        self._limits[(tld, dns_server)] = asyncio.Semaphore(limit)
+
+    async def probe(self, domain: str, dns_server: str) -> CheckResult:
+        """
+        Send one uncached query, for latency measurements
+
+        Bypasses the caches, single-flight, sibling prefetch and concurrency
+        limits: the answer is returned but not stored.
+
+        Args:
+            domain: Full domain name
+            dns_server: DNS server IP to use
+
+        Returns:
+            CheckResult with the measured response time
+        """
+        return await self._resolve(domain, dns_server)
+
+    def _get_resolver(self, dns_server: str) -> Any:
+        """
+        Get the resolver bound to a DNS server, creating it once
+
+        Args:
+            dns_server: DNS server IP
+
+        Returns:
+            Async resolver querying only that server (aiodns.DNSResolver
+            when available, dns.asyncresolver.Resolver otherwise)
+        """
+        resolver = self._resolvers.get(dns_server)
+        if resolver is None and AIODNS_AVAILABLE:
+            # c-ares keeps its UDP socket to the server open and matches
+            # answers to queries by transaction ID, so concurrent checks share
+            # one socket (no per-query socket/bind/close). No pool of our own:
+            # fixed ports would also weaken source-port randomization, the
+            # main defense against spoofed answers.
+            # tries=1: retries and backoff are handled by _resolve
+            resolver = aiodns.DNSResolver(
+                nameservers=[dns_server],
+                timeout=self.timeout,
+                tries=1
+            )
+            self._resolvers[dns_server] = resolver
+        elif resolver is None:
+            # Async: the event loop keeps serving other checks while waiting
+            # for the answer; configure=False skips parsing /etc/resolv.conf
+            # since the nameserver is explicit
+            resolver = dns.asyncresolver.Resolver(configure=False)
+            resolver.nameservers = [dns_server]
+            resolver.timeout = self.timeout
+            resolver.lifetime = self.timeout
+            self._resolvers[dns_server] = resolver
+        return resolver
 
     async def check_domain_availability(
         self,
@@ -49,68 +253,271 @@ class DNSChecker:
             - If SERVFAIL/Timeout after retries → likely available
             - Other errors → unknown (error logged)
         """
+        return await self._lookup(domain, dns_server, prefetch=self.prefetch)
+
+    async def _lookup(self, domain: str, dns_server: str, prefetch: bool) -> CheckResult:
+        """
+        Cached, single-flight lookup behind check_domain_availability
+
+        Args:
+            domain: Full domain name
+            dns_server: DNS server IP to use
+            prefetch: Warm the cache for the sibling TLDs on a cache miss
+
+        Returns:
+            CheckResult with availability status and metadata
+        """
+        cache_key = (domain, dns_server)
+        cached = self.resolved_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("Domain {} is UNAVAILABLE (cached) via {}", domain, dns_server)
+            return cached
+
+        cached = self.nxdomain_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("Domain {} is AVAILABLE (cached) via {}", domain, dns_server)
+            return cached
+
+        # Single-flight: a caller asking for a query already in flight waits
+        # for that answer instead of sending the same packet again. The query
+        # runs in its own task, so a cancelled caller never cancels it for
+        # the others (its answer still lands in the cache).
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(self._resolve_limited(domain, dns_server))
+            self._inflight[cache_key] = task
+            task.add_done_callback(partial(self._query_done, cache_key))
+            if prefetch:
+                self._schedule_prefetch(domain, dns_server)
+        else:
+            logger.debug("Joining in-flight query for {} via {}", domain, dns_server)
+
+        return await asyncio.shield(task)
+
+    async def check_domain_availability_fastest(
+        self,
+        domain: str,
+        dns_servers: Sequence[str]
+    ) -> CheckResult:
+        """
+        Query several DNS servers at once and keep the first clean answer
+
+        Args:
+            domain: Full domain name
+            dns_servers: Equivalent DNS servers (e.g., authoritative servers
+                of the same TLD: a recursive resolver could answer first from
+                a stale negative cache). Empty: the TLD's DNS server
+
+        Returns:
+            First CheckResult without error, else the last one received
+
+        Logic:
+            - A lost packet or slow server no longer costs a timeout + retry
+            - The slower queries are not awaited; their answers still fill
+              the cache
+        """
+        if not dns_servers:
+            dns_servers = (self.get_dns_server_for_tld(self.extract_tld(domain)),)
+
+        if len(dns_servers) == 1:
+            return await self.check_domain_availability(domain, dns_servers[0])
+
+        tasks = [
+            asyncio.ensure_future(self.check_domain_availability(domain, dns_server))
+            for dns_server in dns_servers
+        ]
+        pending = set(tasks)
+        result: Optional[CheckResult] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in tasks:
+                    if task in done:
+                        result = task.result()
+                        if result.error is None:
+                            return result
+            return result
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _schedule_prefetch(self, domain: str, dns_server: str) -> None:
+        """
+        Resolve the same name on the other supported TLDs in the background
+
+        A name checked on one TLD is often checked next on the others
+        (example.fr, then example.com). Prefetches never prefetch in turn, and
+        are dropped when PREFETCH_CONCURRENCY of them are already running.
+
+        Siblings are resolved where their own check will query them: on
+        their TLD's server when dns_server is a TLD server (create_domain,
+        watchers), on the same resolver otherwise (scheduler cycle).
+
+        Args:
+            domain: Domain that just missed the cache
+            dns_server: DNS server IP it is queried on
+        """
+        if self._prefetch_slots.locked():
+            return
+
+        i = domain.rfind('.')
+        if i <= 0:
+            return
+        name, tld = domain[:i], domain[i + 1:].lower()
+        per_tld_server = dns_server in _TLD_AUTHORITATIVE_SERVERS
+        siblings = [
+            (f"{name}.{other}", self.get_dns_server_for_tld(other) if per_tld_server else dns_server)
+            for other in self.supported_tlds if other != tld
+        ]
+        if not siblings:
+            return
+
+        task = asyncio.ensure_future(self._prefetch(siblings))
+        self._prefetch_tasks.add(task)  # Keep a reference until done
+        task.add_done_callback(self._prefetch_tasks.discard)
+
+    async def _prefetch(self, siblings: List[Tuple[str, str]]) -> None:
+        """Look up prefetched (domain, DNS server) pairs (answers only land in the cache)"""
+        async with self._prefetch_slots:
+            logger.debug("Prefetching {}", siblings)
+            await asyncio.gather(
+                *(self._lookup(domain, dns_server, prefetch=False) for domain, dns_server in siblings),
+                return_exceptions=True
+            )
+
+    async def _resolve_limited(self, domain: str, dns_server: str) -> CheckResult:
+        """Run _resolve under the concurrency limit of the TLD on that server, if any"""
+        limit = self._limits.get((self.extract_tld(domain), dns_server))
+        if limit is None:
+            return await self._resolve(domain, dns_server)
+        async with limit:
+            return await self._resolve(domain, dns_server)
+
+    def _query_done(self, cache_key: Tuple[str, str], task: asyncio.Task) -> None:
+        """Forget a finished in-flight query"""
+        self._inflight.pop(cache_key, None)
+        if not task.cancelled():
+            task.exception()  # Mark retrieved when every caller went away
+
+    def invalidate(self, domain: str) -> None:
+        """
+        Drop cached answers for a domain on every DNS server
+
+        Args:
+            domain: Full domain name
+        """
+        for dns_server in list(self._resolvers):
+            self.resolved_cache.pop((domain, dns_server))
+            self.nxdomain_cache.pop((domain, dns_server))
+
+    async def _query(self, resolver: Any, domain: str) -> Optional[int]:
+        """
+        Send one A query, with c-ares errors mapped to dnspython exceptions
+
+        Args:
+            resolver: Resolver from _get_resolver
+            domain: Full domain name
+
+        Returns:
+            TTL of the answer in seconds, or None if it holds no record
+        """
+        if not AIODNS_AVAILABLE:
+            answer = await resolver.resolve(domain, 'A')
+            return answer.rrset.ttl if answer.rrset else None
+
+        try:
+            result = await resolver.query_dns(domain, 'A')
+        except aiodns.error.DNSError as e:
+            code = e.args[0] if e.args else None
+            if code == aiodns.error.ARES_ENOTFOUND:
+                raise dns.resolver.NXDOMAIN() from e
+            if code == aiodns.error.ARES_ENODATA:
+                raise dns.resolver.NoAnswer() from e
+            if code == aiodns.error.ARES_ETIMEOUT:
+                raise dns.resolver.Timeout() from e
+            raise dns.exception.DNSException(str(e)) from e
+        return min((record.ttl for record in result.answer), default=None)
+
+    async def _resolve(self, domain: str, dns_server: str) -> CheckResult:
+        """
+        Query a DNS server for a domain's A record, with retries
+
+        Args:
+            domain: Full domain name
+            dns_server: DNS server IP to use
+
+        Returns:
+            CheckResult with availability status and metadata
+        """
+        cache_key = (domain, dns_server)
         method = f"dns_{dns_server.replace('.', '_')}"
 
-        # Create DNS resolver
-        resolver = dns.resolver.Resolver()
-        resolver.nameservers = [dns_server]
-        resolver.timeout = self.timeout
-        resolver.lifetime = self.timeout
+        resolver = self._get_resolver(dns_server)
 
         for attempt in range(1, self.retry_count + 1):
-            try:
-                # Start timer
-                start_time = time.time()
+            # Start timer (set before the try so every except branch can read it)
+            start_ns = time.perf_counter_ns()
 
+            try:
                 # Try to resolve domain (A record)
-                answer = resolver.resolve(domain, 'A')
+                answer_ttl = await self._query(resolver, domain)
 
                 # Calculate response time
-                response_time_ms = int((time.time() - start_time) * 1000)
+                response_time_ms = _elapsed_ms(start_ns)
 
                 # If we get a response with IPs, domain is NOT available
-                if answer:
+                if answer_ttl is not None:
                     logger.debug(
-                        f"Domain {domain} is UNAVAILABLE (resolved to IPs) "
-                        f"via {dns_server} in {response_time_ms}ms"
+                        "Domain {} is UNAVAILABLE (resolved to IPs) "
+                        "via {} in {}ms",
+                        domain, dns_server, response_time_ms
                     )
-                    return CheckResult(
+                    result = CheckResult(
                         available=False,
                         method=method,
                         response_time_ms=response_time_ms,
                         error=None
                     )
+                    # Never serve the answer past its own DNS TTL
+                    self.resolved_cache.set(cache_key, result, ttl=answer_ttl)
+                    return result
 
             except dns.resolver.NXDOMAIN:
                 # NXDOMAIN = domain does not exist = AVAILABLE
-                response_time_ms = int((time.time() - start_time) * 1000)
+                response_time_ms = _elapsed_ms(start_ns)
                 logger.debug(
-                    f"Domain {domain} is AVAILABLE (NXDOMAIN) "
-                    f"via {dns_server} in {response_time_ms}ms"
+                    "Domain {} is AVAILABLE (NXDOMAIN) "
+                    "via {} in {}ms",
+                    domain, dns_server, response_time_ms
                 )
-                return CheckResult(
+                result = CheckResult(
                     available=True,
                     method=method,
                     response_time_ms=response_time_ms,
                     error=None
                 )
+                self.nxdomain_cache.set(cache_key, result)
+                return result
 
             except (dns.resolver.Timeout, dns.resolver.NoNameservers, dns.exception.DNSException) as e:
                 error_type = type(e).__name__
 
                 if attempt < self.retry_count:
                     logger.warning(
-                        f"DNS check for {domain} via {dns_server} failed "
-                        f"(attempt {attempt}/{self.retry_count}): {error_type}"
+                        "DNS check for {} via {} failed "
+                        "(attempt {}/{}): {}",
+                        domain, dns_server, attempt, self.retry_count, error_type
                     )
-                    time.sleep(0.5)  # Small delay before retry
+                    # Exponential backoff with full jitter (0-0.5s, 0-1s, ...)
+                    await asyncio.sleep(random.uniform(0, RETRY_BASE_DELAY * 2 ** (attempt - 1)))
                     continue
                 else:
                     # After all retries, consider it likely available
-                    response_time_ms = int((time.time() - start_time) * 1000)
+                    response_time_ms = _elapsed_ms(start_ns)
                     logger.warning(
-                        f"Domain {domain} likely AVAILABLE after {self.retry_count} retries "
-                        f"(timeout/servfail) via {dns_server}"
+                        "Domain {} likely AVAILABLE after {} retries "
+                        "(timeout/servfail) via {}",
+                        domain, self.retry_count, dns_server
                     )
                     return CheckResult(
                         available=True,
@@ -121,9 +528,10 @@ class DNSChecker:
 
             except Exception as e:
                 # Unexpected error
-                response_time_ms = int((time.time() - start_time) * 1000)
+                response_time_ms = _elapsed_ms(start_ns)
                 logger.error(
-                    f"Unexpected error checking {domain} via {dns_server}: {str(e)}"
+                    "Unexpected error checking {} via {}: {}",
+                    domain, dns_server, e
                 )
                 return CheckResult(
                     available=False,  # Unknown, mark as unavailable to be safe
@@ -140,33 +548,40 @@ class DNSChecker:
             error="Unexpected flow"
         )
 
-    def extract_tld(self, domain: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def extract_tld(domain: str) -> str:
         """
         Extract TLD from domain name
 
+        Memoized: called on every DNS query (per-TLD concurrency limit), and
+        the same domains come back at each cycle and watcher tick.
+
         Args:
             domain: Full domain name (e.g., example.fr)
 
         Returns:
             TLD without dot (e.g., 'fr')
         """
-        parts = domain.split('.')
-        if len(parts) >= 2:
-            return parts[-1].lower()
-        return ""
+        # rfind: no tuple nor prefix copy, only the TLD slice is built
+        i = domain.rfind('.')
+        return domain[i + 1:].lower() if i >= 0 else ""
 
     def is_supported_tld(self, domain: str) -> bool:
         """
         Check if domain TLD is supported
 
+        One memoized extract_tld plus one frozenset lookup: constant time
+        whatever the number of supported TLDs (even the full ccTLD list), so
+        checking N domains is already a single linear pass.
+
         Args:
             domain: Full domain name
 
         Returns:
             True if TLD is in supported list
         """
-        tld = self.extract_tld(domain)
-        return tld in settings.supported_tlds_list
+        return self.extract_tld(domain) in self.supported_tlds
 
     def get_dns_server_for_tld(self, tld: str) -> str:
         """
@@ -184,20 +599,7 @@ class DNSChecker:
             .net → Verisign (199.7.91.13)
             other → Google DNS (8.8.8.8)
         """
-        tld = tld.lower()
-
-        # AFNIC DNS for .fr domains
-        if tld == "fr":
-            return "192.134.4.1"  # dns.nic.fr
-
-        # Verisign DNS for .com and .net
-        elif tld in ["com", "net"]:
-            return "199.7.91.13"  # a.gtld-servers.net
-
-        # Fallback to Google DNS
-        else:
-            return "8.8.8.8"
-
+        return _TLD_DNS_MAP.get(tld.lower(), _DEFAULT_DNS_SERVER)
 
 # Global instance
 dns_checker = DNSChecker()
@@ -2,10 +2,16 @@
 Notification Service - Send Discord webhook notifications
 """
 import asyncio
+import importlib.util
+import random
+import socket
 from dataclasses import dataclass
-from typing import Optional
+from typing import List, Optional, Tuple
 from datetime import datetime
+from functools import lru_cache
+from urllib.parse import urlsplit
 import httpx
+import orjson
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -13,6 +19,74 @@ from app.config import settings
 from app.models import Domain, Notification
 
 
+# HTTP/2 needs the optional h2 package (httpx[http2]); fall back to HTTP/1.1
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Payloads are serialized with orjson and sent as raw content
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+# ============================================
+# EMBED TEMPLATES
+# ============================================
+# Static parts of the Discord embeds, built once at import. Only the field
+# values and the timestamp change between notifications.
+
+_EMBED_TEMPLATE_AVAILABLE = {
+    "title": "🎯 Domaine disponible !",
+    "color": 65280,  # Green (#00FF00)
+    "footer": {"text": "Domain Monitor"},
+}
+
+_EMBED_TEMPLATE_LOST = {
+    "title": "⚠️ Domaine perdu !",
+    "color": 16711680,  # Red (#FF0000)
+    "footer": {"text": "Domain Monitor - Watcher arrêté"},
+}
+
+_FIELD_NAMES_AVAILABLE = (
+    "📍 Domaine",
+    "🏷️ TLD",
+    "🎨 Niche",
+    "📊 Traffic",
+    "🔗 Referring Domains",
+)
+
+_FIELD_NAMES_LOST = (
+    "📍 Domaine",
+    "🏷️ TLD",
+    "🎨 Niche",
+    "⏱️ Temps disponible",
+    "📊 Traffic",
+    "🔗 Referring Domains",
+)
+
+
+def _build_fields(names: Tuple[str, ...], values: Tuple[str, ...]) -> List[dict]:
+    """
+    Pair embed field names with their values
+
+    Args:
+        names: Field names from a template
+        values: Field values, in the same order
+
+    Returns:
+        List of inline Discord embed fields
+    """
+    return [
+        {"name": name, "value": value, "inline": True}
+        for name, value in zip(names, values)
+    ]
+
+
+@lru_cache(maxsize=4096)
+def _format_thousands(num: int) -> str:
+    """Format an integer with thousands separators (memoized)"""
+    if num == 0:
+        return "0"
+    return f"{num:,}"
+
+
 @dataclass
 class NotificationResult:
     """Result of notification attempt"""
@@ -29,6 +103,88 @@ class NotificationService:
         self.webhook_url = settings.discord_webhook_url
         self.retry_count = settings.discord_retry_count
         self.retry_delay = settings.discord_retry_delay
+        self._client: Optional[httpx.AsyncClient] = None
+
+        self.webhook_host = urlsplit(self.webhook_url).hostname
+        self.dns_refresh_interval = settings.discord_dns_refresh_seconds
+        self._dns_refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        Shared HTTP client, created on first use
+
+        Keeping one client alive reuses the pooled connection to Discord, so
+        only the first notification pays for the TCP+TLS handshake.
+        """
+        if self._client is None or self._client.is_closed:
+            transport = httpx.AsyncHTTPTransport(
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=100)
+            )
+            self._client = httpx.AsyncClient(transport=transport, timeout=10.0)
+        return self._client
+
+    async def refresh_webhook_address(self) -> None:
+        """
+        Resolve the webhook host ahead of the next notification
+
+        Keeps the system resolver cache warm, so the lookup done when the
+        client opens a new connection is answered locally. The client still
+        resolves the host itself (all its addresses, IPv4 or IPv6).
+        """
+        if not self.webhook_host:
+            return
+
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(
+                self.webhook_host, None, type=socket.SOCK_STREAM
+            )
+        except OSError as e:
+            logger.warning("⚠️ Could not resolve webhook host {}: {}", self.webhook_host, e)
+            return
+
+        logger.debug("🔎 Webhook host {} resolved ({} addresses)", self.webhook_host, len(infos))
+
+    async def _dns_refresh_loop(self) -> None:
+        """Background task - re-resolve the webhook host periodically"""
+        while True:
+            await self.refresh_webhook_address()
+            await asyncio.sleep(self.dns_refresh_interval)
+
+    def start_dns_refresh(self) -> None:
+        """Start the webhook host refresh task (called at application startup)"""
+        if self._dns_refresh_task is None or self._dns_refresh_task.done():
+            self._dns_refresh_task = asyncio.create_task(self._dns_refresh_loop())
+
+    async def aclose(self) -> None:
+        """Stop the DNS refresh task and close the HTTP client (called at shutdown)"""
+        if self._dns_refresh_task is not None:
+            self._dns_refresh_task.cancel()
+            try:
+                await self._dns_refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._dns_refresh_task = None
+
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """
+        Delay before retrying a failed webhook call
+
+        Exponential backoff with full jitter, so that services retrying after
+        the same Discord outage do not all hit it again at the same moment.
+
+        Args:
+            attempt: Number of the attempt that just failed (1-based)
+
+        Returns:
+            Delay in seconds, uniform in [0, retry_delay * 2^(attempt-1)]
+        """
+        return random.uniform(0, self.retry_delay * 2 ** (attempt - 1))
 
     def build_discord_embed(self, domain: Domain) -> dict:
         """
@@ -42,38 +198,14 @@ class NotificationService:
         """
         embed = {
             "embeds": [{
-                "title": "🎯 Domaine disponible !",
-                "color": 65280,  # Green (#00FF00)
-                "fields": [
-                    {
-                        "name": "📍 Domaine",
-                        "value": domain.domain,
-                        "inline": True
-                    },
-                    {
-                        "name": "🏷️ TLD",
-                        "value": domain.tld,
-                        "inline": True
-                    },
-                    {
-                        "name": "🎨 Niche",
-                        "value": domain.niche or "Non définie",
-                        "inline": True
-                    },
-                    {
-                        "name": "📊 Traffic",
-                        "value": self._format_number(domain.traffic),
-                        "inline": True
-                    },
-                    {
-                        "name": "🔗 Referring Domains",
-                        "value": self._format_number(domain.referring_domains),
-                        "inline": True
-                    }
-                ],
-                "footer": {
-                    "text": "Domain Monitor"
-                },
+                **_EMBED_TEMPLATE_AVAILABLE,
+                "fields": _build_fields(_FIELD_NAMES_AVAILABLE, (
+                    domain.domain,
+                    domain.tld,
+                    domain.niche or "Non définie",
+                    self._format_number(domain.traffic),
+                    self._format_number(domain.referring_domains),
+                )),
                 "timestamp": datetime.utcnow().isoformat()
             }]
         }
@@ -90,14 +222,13 @@ class NotificationService:
         Returns:
             Formatted string (e.g., "1,234")
         """
-        if num == 0:
-            return "0"
-        return f"{num:,}"
+        return _format_thousands(num)
 
     async def send_discord_notification(
         self,
         domain: Domain,
-        db: AsyncSession
+        db: AsyncSession,
+        commit: bool = True
     ) -> NotificationResult:
         """
         Send Discord notification with retry logic
@@ -105,6 +236,8 @@ class NotificationService:
         Args:
             domain: Domain model instance
             db: Database session
+            commit: Commit the notification row (False leaves it pending in
+                the caller's transaction)
 
         Returns:
             NotificationResult with success status
@@ -123,85 +256,87 @@ class NotificationService:
         # Try sending with retries
         for attempt in range(1, self.retry_count + 1):
             try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.post(
-                        self.webhook_url,
-                        json=embed,
-                        timeout=10.0
+                response = await self.client.post(
+                    self.webhook_url,
+                    content=orjson.dumps(embed),
+                    headers=_JSON_HEADERS
+                )
+
+                # Success (Discord returns 204 No Content)
+                if response.status_code == 204:
+                    logger.success(
+                        f"✅ Discord notification sent successfully for {domain.domain}"
                     )
 
-                    # Success (Discord returns 204 No Content)
-                    if response.status_code == 204:
-                        logger.success(
-                            f"✅ Discord notification sent successfully for {domain.domain}"
-                        )
+                    # Save to database
+                    await self._save_notification(
+                        domain_id=domain.id,
+                        success=True,
+                        http_status=204,
+                        response="Success",
+                        db=db,
+                        commit=commit
+                    )
+
+                    return NotificationResult(
+                        success=True,
+                        http_status=204,
+                        response="Success"
+                    )
+
+                # Rate limited (429)
+                elif response.status_code == 429:
+                    retry_after = orjson.loads(response.content).get("retry_after", self.retry_delay)
+                    logger.warning(
+                        f"⏳ Discord rate limit hit for {domain.domain}, "
+                        f"waiting {retry_after}s (attempt {attempt}/{self.retry_count})"
+                    )
 
-                        # Save to database
+                    if attempt < self.retry_count:
+                        await asyncio.sleep(retry_after)
+                        continue
+                    else:
+                        # Max retries reached
                         await self._save_notification(
                             domain_id=domain.id,
-                            success=True,
-                            http_status=204,
-                            response="Success",
-                            db=db
+                            success=False,
+                            http_status=429,
+                            response=response.text,
+                            db=db,
+                            commit=commit
                         )
-
                         return NotificationResult(
-                            success=True,
-                            http_status=204,
-                            response="Success"
+                            success=False,
+                            http_status=429,
+                            response=response.text,
+                            error="Rate limit exceeded"
                         )
 
-                    # Rate limited (429)
-                    elif response.status_code == 429:
-                        retry_after = response.json().get("retry_after", self.retry_delay)
-                        logger.warning(
-                            f"⏳ Discord rate limit hit for {domain.domain}, "
-                            f"waiting {retry_after}s (attempt {attempt}/{self.retry_count})"
-                        )
+                # Other error status
+                else:
+                    logger.error(
+                        f"❌ Discord notification failed for {domain.domain}: "
+                        f"HTTP {response.status_code} - {response.text}"
+                    )
 
-                        if attempt < self.retry_count:
-                            await asyncio.sleep(retry_after)
-                            continue
-                        else:
-                            # Max retries reached
-                            await self._save_notification(
-                                domain_id=domain.id,
-                                success=False,
-                                http_status=429,
-                                response=response.text,
-                                db=db
-                            )
-                            return NotificationResult(
-                                success=False,
-                                http_status=429,
-                                response=response.text,
-                                error="Rate limit exceeded"
-                            )
-
-                    # Other error status
+                    if attempt < self.retry_count:
+                        await asyncio.sleep(self._backoff_delay(attempt))
+                        continue
                     else:
-                        logger.error(
-                            f"❌ Discord notification failed for {domain.domain}: "
-                            f"HTTP {response.status_code} - {response.text}"
+                        await self._save_notification(
+                            domain_id=domain.id,
+                            success=False,
+                            http_status=response.status_code,
+                            response=response.text,
+                            db=db,
+                            commit=commit
+                        )
+                        return NotificationResult(
+                            success=False,
+                            http_status=response.status_code,
+                            response=response.text,
+                            error=f"HTTP {response.status_code}"
                         )
-
-                        if attempt < self.retry_count:
-                            await asyncio.sleep(self.retry_delay * attempt)
-                            continue
-                        else:
-                            await self._save_notification(
-                                domain_id=domain.id,
-                                success=False,
-                                http_status=response.status_code,
-                                response=response.text,
-                                db=db
-                            )
-                            return NotificationResult(
-                                success=False,
-                                http_status=response.status_code,
-                                response=response.text,
-                                error=f"HTTP {response.status_code}"
-                            )
 
             except Exception as e:
                 logger.error(
@@ -209,7 +344,7 @@ class NotificationService:
                 )
 
                 if attempt < self.retry_count:
-                    await asyncio.sleep(self.retry_delay * attempt)
+                    await asyncio.sleep(self._backoff_delay(attempt))
                     continue
                 else:
                     await self._save_notification(
@@ -217,7 +352,8 @@ class NotificationService:
                         success=False,
                         http_status=None,
                         response=str(e),
-                        db=db
+                        db=db,
+                        commit=commit
                     )
                     return NotificationResult(
                         success=False,
@@ -240,7 +376,8 @@ class NotificationService:
         success: bool,
         http_status: Optional[int],
         response: str,
-        db: AsyncSession
+        db: AsyncSession,
+        commit: bool = True
     ) -> None:
         """
         Save notification result to database
@@ -251,6 +388,7 @@ class NotificationService:
             http_status: HTTP status code
             response: Response text
             db: Database session
+            commit: Commit after adding the row
         """
         notification = Notification(
             domain_id=domain_id,
@@ -259,7 +397,9 @@ class NotificationService:
             webhook_response=response
         )
         db.add(notification)
-        await db.commit()
+
+        if commit:
+            await db.commit()
 
     async def send_domain_lost_notification(
         self,
@@ -288,80 +428,51 @@ class NotificationService:
 
         embed = {
             "embeds": [{
-                "title": "⚠️ Domaine perdu !",
+                **_EMBED_TEMPLATE_LOST,
                 "description": f"Le domaine **{domain.domain}** n'est plus disponible.",
-                "color": 16711680,  # Red (#FF0000)
-                "fields": [
-                    {
-                        "name": "📍 Domaine",
-                        "value": domain.domain,
-                        "inline": True
-                    },
-                    {
-                        "name": "🏷️ TLD",
-                        "value": domain.tld,
-                        "inline": True
-                    },
-                    {
-                        "name": "🎨 Niche",
-                        "value": domain.niche or "Non définie",
-                        "inline": True
-                    },
-                    {
-                        "name": "⏱️ Temps disponible",
-                        "value": time_available or "Inconnu",
-                        "inline": True
-                    },
-                    {
-                        "name": "📊 Traffic",
-                        "value": self._format_number(domain.traffic),
-                        "inline": True
-                    },
-                    {
-                        "name": "🔗 Referring Domains",
-                        "value": self._format_number(domain.referring_domains),
-                        "inline": True
-                    }
-                ],
-                "footer": {
-                    "text": "Domain Monitor - Watcher arrêté"
-                },
+                "fields": _build_fields(_FIELD_NAMES_LOST, (
+                    domain.domain,
+                    domain.tld,
+                    domain.niche or "Non définie",
+                    time_available or "Inconnu",
+                    self._format_number(domain.traffic),
+                    self._format_number(domain.referring_domains),
+                )),
                 "timestamp": datetime.utcnow().isoformat()
             }]
         }
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self.webhook_url,
-                    json=embed,
-                    timeout=10.0
-                )
+            response = await self.client.post(
+                self.webhook_url,
+                content=orjson.dumps(embed),
+                headers=_JSON_HEADERS
+            )
 
-                if response.status_code == 204:
-                    logger.success(f"✅ 'Domain lost' notification sent for {domain.domain}")
+            if response.status_code == 204:
+                logger.success(f"✅ 'Domain lost' notification sent for {domain.domain}")
 
-                    await self._save_notification(
-                        domain_id=domain.id,
-                        success=True,
-                        http_status=204,
-                        response="Success - Domain Lost",
-                        db=db
-                    )
+                await self._save_notification(
+                    domain_id=domain.id,
+                    success=True,
+                    http_status=204,
+                    response="Success - Domain Lost",
+                    db=db
+                )
 
-                    return NotificationResult(
-                        success=True,
-                        http_status=204,
-                        response="Success"
-                    )
-                else:
-                    logger.error(f"❌ Failed to send 'domain lost' notification: HTTP {response.status_code}")
-                    return NotificationResult(
-                        success=False,
-                        http_status=response.status_code,
-                        response=response.text,
-                        error=f"HTTP {response.status_code}"
-                    )
+                return NotificationResult(
+                    success=True,
+                    http_status=204,
+                    response="Success"
+                )
+            else:
+                logger.error(f"❌ Failed to send 'domain lost' notification: HTTP {response.status_code}")
+                return NotificationResult(
+                    success=False,
+                    http_status=response.status_code,
+                    response=response.text,
+                    error=f"HTTP {response.status_code}"
+                )
 
         except Exception as e:
             logger.error(f"❌ Exception sending 'domain lost' notification: {str(e)}")
@@ -401,28 +512,27 @@ class NotificationService:
         }
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self.webhook_url,
-                    json=test_embed,
-                    timeout=10.0
-                )
+            response = await self.client.post(
+                self.webhook_url,
+                content=orjson.dumps(test_embed),
+                headers=_JSON_HEADERS
+            )
 
-                if response.status_code == 204:
-                    logger.success("✅ Test notification sent successfully")
-                    return NotificationResult(
-                        success=True,
-                        http_status=204,
-                        response="Success"
-                    )
-                else:
-                    logger.error(f"❌ Test notification failed: HTTP {response.status_code}")
-                    return NotificationResult(
-                        success=False,
-                        http_status=response.status_code,
-                        response=response.text,
-                        error=f"HTTP {response.status_code}"
-                    )
+            if response.status_code == 204:
+                logger.success("✅ Test notification sent successfully")
+                return NotificationResult(
+                    success=True,
+                    http_status=204,
+                    response="Success"
+                )
+            else:
+                logger.error(f"❌ Test notification failed: HTTP {response.status_code}")
+                return NotificationResult(
+                    success=False,
+                    http_status=response.status_code,
+                    response=response.text,
+                    error=f"HTTP {response.status_code}"
+                )
 
         except Exception as e:
             logger.error(f"❌ Exception sending test notification: {str(e)}")
@@ -2,21 +2,34 @@
 Scheduler Service - Automated domain checking with APScheduler
 """
 import asyncio
+import secrets
+import statistics
 from datetime import datetime
-from typing import List
+from typing import Dict, List, Optional, Tuple
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
-from sqlalchemy import select, func, text
+from sqlalchemy import select, func, text, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from loguru import logger
 
 from app.config import settings
-from app.database import AsyncSessionLocal
+from app.database import AsyncSessionLocal, engine
 from app.models import Domain, DomainStatus
-from app.services.availability import availability_service
+from app.services.availability import DomainView, availability_service
+from app.services.dns_checker import dns_checker
 from app.services.notification import notification_service
 
 
+# Columns read by the check loop, in DomainView field order
+_CHECK_COLUMNS = (Domain.id, Domain.domain, Domain.tld, Domain.status, Domain.previous_status)
+
+# Interval of the old logs cleanup job
+CLEANUP_INTERVAL_HOURS = 24
+
+# Lower bound of the calibrated per-TLD/server DNS concurrency
+MIN_DNS_CONCURRENCY = 8
+
+
 class SchedulerService:
     """Service for scheduling automated domain checks"""
 
@@ -26,22 +39,28 @@ class SchedulerService:
         self.batch_size = settings.batch_size
         self.delay_between_checks_ms = settings.delay_between_checks_ms
         self.is_running = False
+        self._calibration_task: Optional[asyncio.Task] = None
 
     async def run_check_cycle(self) -> None:
         """
         Main check cycle - verify all active domains
 
         Logic:
-            1. Get all active domains
-            2. Process in batches
-            3. For each domain:
-               - Verify availability
-               - Send notification if needed
-               - Save check logs
+            1. Count active domains
+            2. Fetch and process them batch by batch (keyset pagination)
+            3. For each batch:
+               - Verify all domains concurrently
+               - Queue check logs
+               - Commit the statuses and check logs in one transaction
+               - Then send notifications if needed, and commit the
+                 notification rows with the notified domains' check logs
             4. Log summary statistics
-            5. Call cleanup procedure
+
+        Old logs are cleaned up by a separate daily job (see _cleanup_old_logs)
         """
-        start_time = datetime.utcnow()
+        # Elapsed time only, never persisted: the loop's monotonic clock
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
         logger.info("=" * 80)
         logger.info("🚀 Starting domain check cycle")
         logger.info("=" * 80)
@@ -55,119 +74,285 @@ class SchedulerService:
 
         async with AsyncSessionLocal() as db:
             try:
-                # Get all active domains
-                stmt = select(Domain).where(Domain.is_active == True)
-                result = await db.execute(stmt)
-                domains = result.scalars().all()
-
-                total = len(domains)
-                logger.info(f"📊 Found {total} active domains to check")
+                # Count active domains
+                total = await db.scalar(
+                    select(func.count()).select_from(Domain).where(Domain.is_active == True)
+                )
+                logger.info("📊 Found {} active domains to check", total)
 
                 if total == 0:
                     logger.warning("⚠️ No active domains found, skipping cycle")
                     return
 
-                # Process in batches
-                for i in range(0, total, self.batch_size):
-                    batch = domains[i:i + self.batch_size]
-                    batch_num = (i // self.batch_size) + 1
-                    total_batches = (total + self.batch_size - 1) // self.batch_size
-
-                    logger.info(f"📦 Processing batch {batch_num}/{total_batches} ({len(batch)} domains)")
-
-                    for domain in batch:
-                        try:
-                            # Verify domain
-                            logger.debug(f"Checking domain: {domain.domain}")
-                            verification_result = await availability_service.verify_domain(
-                                domain=domain,
-                                db=db
-                            )
-
-                            checked += 1
-
-                            # Save check logs
-                            await availability_service.save_check_logs(
-                                domain_id=domain.id,
-                                check_logs=verification_result.check_logs,
-                                db=db
-                            )
-
-                            # Count available domains
-                            if verification_result.is_available:
-                                available_count += 1
-
-                                # Send notification if needed
-                                if verification_result.should_notify:
-                                    logger.info(f"📨 Sending notification for {domain.domain}")
-                                    notif_result = await notification_service.send_discord_notification(
-                                        domain=domain,
-                                        db=db
-                                    )
-
-                                    if notif_result.success:
-                                        notifications_sent += 1
-
-                                        # Update check logs to mark notification sent
-                                        await db.execute(
-                                            text(
-                                                "UPDATE check_logs SET notification_sent = TRUE "
-                                                "WHERE domain_id = :domain_id "
-                                                "ORDER BY checked_at DESC LIMIT 1"
-                                            ),
-                                            {"domain_id": domain.id}
-                                        )
-                                        await db.commit()
-
-                            # Small delay between checks to avoid overwhelming DNS servers
-                            await asyncio.sleep(self.delay_between_checks_ms / 1000.0)
-
-                        except Exception as e:
+                total_batches = (total + self.batch_size - 1) // self.batch_size
+                batch_num = 0
+                last_id = 0
+
+                # Process in batches, fetched one at a time with keyset
+                # pagination (only one batch of rows in memory)
+                while True:
+                    # Plain rows copied into DomainViews: no ORM instances
+                    # (nor instrumented attribute access) in the check loop
+                    result = await db.execute(
+                        select(*_CHECK_COLUMNS)
+                        .where(Domain.is_active == True, Domain.id > last_id)
+                        .order_by(Domain.id)
+                        .limit(self.batch_size)
+                    )
+                    batch = [DomainView(*row) for row in result]
+                    if not batch:
+                        break
+
+                    last_id = batch[-1].id
+                    batch_num += 1
+
+                    logger.info("📦 Processing batch {}/{} ({} domains)", batch_num, total_batches, len(batch))
+
+                    batch_logs: List[dict] = []
+                    batch_changes: List[dict] = []
+                    # Domains to notify and their check logs, inserted once
+                    # the notification outcome is known
+                    to_notify: List[Tuple[DomainView, List[dict]]] = []
+
+                    # Verify the whole batch concurrently
+                    results = await availability_service.verify_domains(
+                        batch,
+                        db,
+                        concurrency=self.batch_size,
+                        stagger_seconds=self.delay_between_checks_ms / 1000.0,
+                        commit=False
+                    )
+
+                    for domain, verification_result in zip(batch, results):
+                        if isinstance(verification_result, Exception):
                             errors += 1
-                            logger.error(f"❌ Error checking domain {domain.domain}: {str(e)}")
+                            logger.error("❌ Error checking domain {}: {}", domain.domain, verification_result)
                             continue
 
+                        checked += 1
+                        batch_changes.append(domain.changes())
+
+                        domain_logs = [
+                            {"domain_id": domain.id, **log_data}
+                            for log_data in verification_result.check_logs
+                        ]
+
+                        # Count available domains
+                        if verification_result.is_available:
+                            available_count += 1
+
+                        if verification_result.should_notify:
+                            to_notify.append((domain, domain_logs))
+                        else:
+                            batch_logs.extend(domain_logs)
+
+                    # One UPDATE (by primary key) for the batch's statuses and
+                    # one INSERT for its check logs, committed before anything
+                    # is posted: a failed commit must not lead the next cycle
+                    # to send the same notification again
+                    try:
+                        if batch_changes:
+                            # Skip the domains deleted while the batch was being
+                            # checked (the bulk UPDATE by primary key fails on a
+                            # missing row), and lock the others until the commit
+                            # so no DELETE lands before their check logs
+                            existing = set(await db.scalars(
+                                select(Domain.id)
+                                .where(Domain.id.in_([change["id"] for change in batch_changes]))
+                                .with_for_update()
+                            ))
+                            if len(existing) < len(batch_changes):
+                                logger.info(
+                                    "🗑️ Skipping {} domains deleted during batch {}/{}",
+                                    len(batch_changes) - len(existing), batch_num, total_batches
+                                )
+                                batch_changes = [c for c in batch_changes if c["id"] in existing]
+                                batch_logs = [log for log in batch_logs if log["domain_id"] in existing]
+                                to_notify = [item for item in to_notify if item[0].id in existing]
+
+                        if batch_changes:
+                            await db.execute(update(Domain), batch_changes)
+                        await availability_service.save_check_log_rows(batch_logs, db, commit=False)
+                        await db.commit()
+                    except Exception as e:
+                        await db.rollback()
+                        errors += 1
+                        logger.error("❌ Failed to commit batch {}/{}: {}", batch_num, total_batches, e)
+                    else:
+                        if to_notify:
+                            sent, failed = await self._notify_batch(to_notify, db)
+                            notifications_sent += sent
+                            errors += failed
+
+                    # Release the notified domains' ORM rows before the next batch
+                    db.expunge_all()
+
                 # Calculate duration
-                duration = (datetime.utcnow() - start_time).total_seconds()
+                duration = loop.time() - start_time
 
                 # Log summary
                 logger.info("=" * 80)
-                logger.success(f"✅ Check cycle completed in {duration:.2f}s")
-                logger.info(f"📊 Statistics:")
-                logger.info(f"   - Total domains: {total}")
-                logger.info(f"   - Checked: {checked}")
-                logger.info(f"   - Available: {available_count}")
-                logger.info(f"   - Notifications sent: {notifications_sent}")
-                logger.info(f"   - Errors: {errors}")
+                logger.success("✅ Check cycle completed in {:.2f}s", duration)
+                logger.info("📊 Statistics:")
+                logger.info("   - Total domains: {}", total)
+                logger.info("   - Checked: {}", checked)
+                logger.info("   - Available: {}", available_count)
+                logger.info("   - Notifications sent: {}", notifications_sent)
+                logger.info("   - Errors: {}", errors)
                 logger.info("=" * 80)
 
-                # Call cleanup procedure (remove old logs)
-                await self._cleanup_old_logs(db)
-
             except Exception as e:
-                logger.error(f"❌ Fatal error in check cycle: {str(e)}")
+                logger.error("❌ Fatal error in check cycle: {}", e)
                 raise
 
-    async def _cleanup_old_logs(self, db: AsyncSession) -> None:
+    async def _notify_batch(
+        self,
+        to_notify: List[Tuple[DomainView, List[dict]]],
+        db: AsyncSession
+    ) -> Tuple[int, int]:
         """
-        Call MySQL stored procedure to cleanup old logs
+        Send the notifications of a batch whose statuses are committed
+
+        Notifications are sent sequentially (each one is saved through the
+        shared session), then the Notification rows and the notified
+        domains' check logs are committed together.
 
         Args:
+            to_notify: Domains to notify with their pending check logs
             db: Database session
+
+        Returns:
+            Tuple of (notifications sent, errors)
         """
+        sent = 0
+        errors = 0
+        logs: List[dict] = []
+
+        for domain, domain_logs in to_notify:
+            logs.extend(domain_logs)
+
+            try:
+                logger.info("📨 Sending notification for {}", domain.domain)
+
+                # Only notified domains are loaded as ORM rows (the embed
+                # needs niche, traffic...)
+                orm_domain = await db.get(Domain, domain.id)
+                notif_result = await notification_service.send_discord_notification(
+                    domain=orm_domain,
+                    db=db,
+                    commit=False
+                )
+
+                if notif_result.success:
+                    sent += 1
+
+                    # Mark the latest check log (not inserted yet)
+                    if domain_logs:
+                        domain_logs[-1]["notification_sent"] = True
+
+            except Exception as e:
+                errors += 1
+                logger.error("❌ Error notifying for domain {}: {}", domain.domain, e)
+
         try:
-            logger.debug("🧹 Running cleanup_old_logs procedure")
-            await db.execute(text("CALL cleanup_old_logs()"))
+            await availability_service.save_check_log_rows(logs, db, commit=False)
             await db.commit()
+        except Exception as e:
+            await db.rollback()
+            errors += 1
+            logger.error("❌ Failed to save notifications: {}", e)
+
+        return sent, errors
+
+    async def _cleanup_old_logs(self) -> None:
+        """
+        Call MySQL stored procedure to cleanup old logs
+
+        Runs as its own daily job with its own session, so a slow cleanup
+        never delays a check cycle
+        """
+        try:
+            logger.debug("🧹 Running cleanup_old_logs procedure")
+            async with AsyncSessionLocal() as db:
+                await db.execute(text("CALL cleanup_old_logs()"))
+                await db.commit()
             logger.debug("✅ Cleanup procedure completed")
         except Exception as e:
-            logger.warning(f"⚠️ Cleanup procedure failed: {str(e)}")
+            logger.warning("⚠️ Cleanup procedure failed: {}", e)
+
+    async def calibrate(self) -> Dict[Tuple[str, str], int]:
+        """
+        Measure DNS latency per TLD and server and size their query concurrency
+
+        Returns:
+            Concurrency limit applied per (TLD, DNS server)
+
+        Logic:
+            - Each TLD is probed on the servers that check it: the primary
+              and secondary resolvers (check cycle) and its own TLD server
+              (create_domain, watchers)
+            - Send dns_calibration_probes random (nonexistent) names to each,
+              through DNSChecker.probe: nothing is cached nor prefetched
+            - Take the median response time of the answered probes
+            - limit = target queries/s x RTT (queries in flight needed to
+              sustain the target rate), between MIN_DNS_CONCURRENCY and
+              batch_size
+            - Servers with no answered probe keep no limit
+        """
+        limits: Dict[Tuple[str, str], int] = {}
+
+        for tld in settings.supported_tlds_list:
+            dns_servers = dict.fromkeys((
+                settings.dns_primary_server,
+                settings.dns_secondary_server,
+                dns_checker.get_dns_server_for_tld(tld),
+            ))
+            for dns_server in dns_servers:
+                probes = [
+                    f"calibration-{secrets.token_hex(8)}.{tld}"
+                    for _ in range(settings.dns_calibration_probes)
+                ]
+                results = await asyncio.gather(
+                    *(dns_checker.probe(probe, dns_server) for probe in probes),
+                    return_exceptions=True
+                )
+                rtts = [
+                    result.response_time_ms for result in results
+                    if not isinstance(result, BaseException) and result.error is None
+                ]
+                if not rtts:
+                    logger.warning(
+                        "⚠️ DNS calibration for .{} via {} got no answer, leaving it unbounded",
+                        tld, dns_server
+                    )
+                    continue
+
+                rtt_seconds = statistics.median(rtts) / 1000
+                limit = int(settings.dns_target_queries_per_second * rtt_seconds)
+                limit = max(MIN_DNS_CONCURRENCY, min(self.batch_size, limit))
+
+                dns_checker.set_concurrency_limit(tld, dns_server, limit)
+                limits[(tld, dns_server)] = limit
+                logger.info(
+                    "📐 DNS calibration for .{} via {}: median RTT {:.0f}ms → {} concurrent queries",
+                    tld, dns_server, rtt_seconds * 1000, limit
+                )
+
+        return limits
+
+    async def _run_calibration(self) -> None:
+        """Background startup calibration - never fails the scheduler"""
+        try:
+            await self.calibrate()
+        except Exception as e:
+            logger.warning("⚠️ DNS calibration failed: {}", e)
 
     def start_scheduler(self) -> None:
         """
         Start the APScheduler
 
-        Adds the check cycle job and starts the scheduler
+        Adds the check cycle job, starts the scheduler and launches the DNS
+        calibration in the background (it must not delay startup)
         """
         if self.is_running:
             logger.warning("⚠️ Scheduler is already running")
@@ -185,16 +370,29 @@ class SchedulerService:
             max_instances=1,  # Prevent concurrent executions
             coalesce=True,    # Merge missed executions
         )
+        self.scheduler.add_job(
+            self._cleanup_old_logs,
+            trigger=IntervalTrigger(hours=CLEANUP_INTERVAL_HOURS),
+            id="cleanup_old_logs",
+            name="Old Logs Cleanup",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+        )
 
         # Start scheduler
         self.scheduler.start()
         self.is_running = True
 
+        if settings.dns_calibration_probes > 0:
+            self._calibration_task = asyncio.create_task(self._run_calibration())
+
         # Log next run time
         next_run = self.scheduler.get_job("domain_check_cycle").next_run_time
-        logger.success(f"✅ Scheduler started successfully")
-        logger.info(f"⏰ Next check cycle: {next_run}")
-        logger.info(f"🔄 Check interval: every {self.check_interval_hours} hour(s)")
+        logger.success("✅ Scheduler started successfully")
+        logger.info("⏰ Next check cycle: {}", next_run)
+        logger.info("🔄 Check interval: every {} hour(s)", self.check_interval_hours)
+        logger.info("🗄️ Database pool: {}", engine.pool.status())
 
     def shutdown_scheduler(self) -> None:
         """
@@ -205,6 +403,8 @@ class SchedulerService:
             return
 
         logger.info("🛑 Shutting down scheduler")
+        if self._calibration_task is not None and not self._calibration_task.done():
+            self._calibration_task.cancel()
         self.scheduler.shutdown(wait=True)
         self.is_running = False
         logger.success("✅ Scheduler stopped successfully")
@@ -2,154 +2,97 @@
 Watcher Service - Continuous monitoring for available domains
 """
 import asyncio
-from typing import Dict, Optional
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, Union
 from datetime import datetime
 from loguru import logger
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update
 
 from app.config import settings
 from app.models import Domain, DomainStatus
 from app.database import AsyncSessionLocal
-from app.services.dns_checker import dns_checker
+from app.services.dns_checker import CheckResult, dns_checker
 from app.services.notification import notification_service
 
 
-class DomainWatcher:
-    """Watcher for a single domain - checks every 2 seconds"""
-
-    def __init__(self, domain_id: int, domain_name: str):
-        self.domain_id = domain_id
-        self.domain_name = domain_name
-        self.is_running = False
-        self.task: Optional[asyncio.Task] = None
-
-    async def start(self):
-        """Start watching the domain"""
-        if self.is_running:
-            logger.warning(f"Watcher for {self.domain_name} is already running")
-            return
+# Interval between two checks of a watched domain
+WATCH_INTERVAL_SECONDS = 2.0
 
-        self.is_running = True
-        self.task = asyncio.create_task(self._watch_loop())
-        logger.success(f"🔍 Started watcher for {self.domain_name} (checking every 2 seconds)")
+# How often last_checked is written while watched domains stay available
+LAST_CHECKED_FLUSH_SECONDS = 30
 
-    async def stop(self):
-        """Stop watching the domain"""
-        if not self.is_running:
-            return
 
-        self.is_running = False
-        if self.task:
-            self.task.cancel()
-            try:
-                await self.task
-            except asyncio.CancelledError:
-                pass
-
-        logger.info(f"🛑 Stopped watcher for {self.domain_name}")
-
-    async def _watch_loop(self):
-        """Main watch loop - checks every 2 seconds"""
-        logger.info(f"👁️ Watching {self.domain_name} - checking every 2 seconds")
-
-        while self.is_running:
-            try:
-                async with AsyncSessionLocal() as db:
-                    # Get domain from database
-                    from sqlalchemy import select
-                    result = await db.execute(
-                        select(Domain).where(Domain.id == self.domain_id)
-                    )
-                    domain = result.scalar_one_or_none()
-
-                    if not domain:
-                        logger.error(f"Domain {self.domain_name} not found, stopping watcher")
-                        await self.stop()
-                        break
-
-                    # Check availability
-                    check_result = await dns_checker.check_domain_availability(
-                        domain.domain,
-                        dns_checker.get_dns_server_for_tld(domain.tld)
-                    )
-
-                    # If domain is still AVAILABLE
-                    if check_result.available:
-                        logger.debug(f"✅ {self.domain_name} is still AVAILABLE")
-                        # Keep status as available, no notification (anti-spam)
-                        domain.last_checked = datetime.utcnow()
-                        await db.commit()
-
-                    # If domain became UNAVAILABLE
-                    else:
-                        logger.warning(f"⚠️ {self.domain_name} became UNAVAILABLE - stopping watcher")
-
-                        # Update domain status
-                        domain.previous_status = domain.status
-                        domain.status = DomainStatus.UNAVAILABLE
-                        domain.is_active = False  # Stop monitoring
-                        domain.last_checked = datetime.utcnow()
-                        await db.commit()
-
-                        # Send notification that domain was lost
-                        try:
-                            await notification_service.send_domain_lost_notification(
-                                domain, db
-                            )
-                        except Exception as e:
-                            logger.error(f"Failed to send lost notification: {str(e)}")
-
-                        # Stop watcher
-                        await self.stop()
-                        break
-
-                # Wait 2 seconds before next check
-                await asyncio.sleep(2)
-
-            except asyncio.CancelledError:
-                logger.info(f"Watcher for {self.domain_name} was cancelled")
-                break
-            except Exception as e:
-                logger.error(f"Error in watcher for {self.domain_name}: {str(e)}")
-                await asyncio.sleep(2)  # Continue even on error
+@dataclass
+class DomainWatcher:
+    """A watched domain - what the tick loop needs to check it without the database"""
+    domain_id: int
+    domain_name: str
+    tld: str
+    # Queried together, first clean answer wins
+    dns_servers: Tuple[str, ...]
+    # Checked since the last last_checked flush
+    checked: bool = False
 
 
 class WatcherService:
-    """Service to manage multiple domain watchers"""
+    """
+    Service to manage domain watchers
+
+    All watched domains are checked by a single tick loop: every 2 seconds
+    their DNS checks run concurrently, and the domains that became
+    unavailable are updated in one transaction.
+    """
 
     def __init__(self):
         self.watchers: Dict[int, DomainWatcher] = {}
+        self.concurrency = settings.batch_size
+        self._task: Optional[asyncio.Task] = None
+        self.extra_dns_servers = tuple(
+            server.strip() for server in settings.watcher_extra_dns_servers.split(",") if server.strip()
+        )
 
-    async def start_watcher(self, domain_id: int, domain_name: str):
+    async def start_watcher(self, domain_id: int, domain_name: str, tld: str):
         """Start a watcher for a domain"""
-        # Stop existing watcher if any
-        if domain_id in self.watchers:
-            await self.stop_watcher(domain_id)
+        self.watchers[domain_id] = DomainWatcher(
+            domain_id=domain_id,
+            domain_name=domain_name,
+            tld=tld,
+            dns_servers=tuple(dict.fromkeys(
+                (dns_checker.get_dns_server_for_tld(tld),) + self.extra_dns_servers
+            ))
+        )
 
-        # Create and start new watcher
-        watcher = DomainWatcher(domain_id, domain_name)
-        self.watchers[domain_id] = watcher
-        await watcher.start()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._tick_loop())
 
-        logger.success(f"🚀 Watcher started for domain {domain_name} (ID: {domain_id})")
+        logger.success("🚀 Watcher started for domain {} (ID: {}, checking every 2 seconds)", domain_name, domain_id)
 
     async def stop_watcher(self, domain_id: int):
         """Stop a watcher for a domain"""
-        if domain_id not in self.watchers:
+        if self.watchers.pop(domain_id, None) is None:
             return
 
-        watcher = self.watchers[domain_id]
-        await watcher.stop()
-        del self.watchers[domain_id]
-
-        logger.info(f"🛑 Watcher stopped for domain ID {domain_id}")
+        logger.info("🛑 Watcher stopped for domain ID {}", domain_id)
 
     async def stop_all_watchers(self):
         """Stop all active watchers"""
-        logger.info(f"🛑 Stopping all {len(self.watchers)} active watchers...")
+        logger.info("🛑 Stopping all {} active watchers...", len(self.watchers))
 
-        for domain_id in list(self.watchers.keys()):
-            await self.stop_watcher(domain_id)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        # Write pending last_checked values before dropping the watchers
+        try:
+            await self.flush_last_checked()
+        except Exception as e:
+            logger.error("Failed to flush watcher last_checked: {}", e)
+
+        self.watchers.clear()
 
         logger.success("✅ All watchers stopped")
 
@@ -161,6 +104,145 @@ class WatcherService:
         """Check if a domain is being watched"""
         return domain_id in self.watchers
 
+    async def _tick_loop(self) -> None:
+        """
+        Main watch loop - checks every watched domain every 2 seconds
+
+        Logic:
+            - Each tick starts WATCH_INTERVAL_SECONDS after the previous one,
+              however long the DNS queries take
+            - last_checked is written every LAST_CHECKED_FLUSH_SECONDS
+            - The loop ends when no domain is watched anymore
+        """
+        logger.info("👁️ Watcher loop started - checking every 2 seconds")
+
+        loop = asyncio.get_running_loop()
+        last_flush = loop.time()
+
+        while self.watchers:
+            deadline = loop.time() + WATCH_INTERVAL_SECONDS
+
+            try:
+                await self._tick()
+
+                if loop.time() - last_flush >= LAST_CHECKED_FLUSH_SECONDS:
+                    last_flush = loop.time()
+                    await self.flush_last_checked()
+
+            except asyncio.CancelledError:
+                logger.info("Watcher loop was cancelled")
+                raise
+            except Exception as e:
+                logger.error("Error in watcher loop: {}", e)
+                # Continue even on error
+
+            # Wait until the next tick
+            remaining = deadline - loop.time()
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+            else:
+                logger.debug("⏱️ Watcher loop is {:.0f}ms behind", -remaining * 1000)
+
+        # No await between the emptiness check above and returning, so a
+        # watcher added meanwhile always finds this task done and restarts it
+        logger.info("👁️ Watcher loop stopped (no domain left to watch)")
+
+    async def _tick(self) -> None:
+        """Check all watched domains once and handle the ones that were lost"""
+        watchers = list(self.watchers.values())
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def check(watcher: DomainWatcher) -> Union[CheckResult, Exception]:
+            async with semaphore:
+                try:
+                    return await dns_checker.check_domain_availability_fastest(
+                        watcher.domain_name,
+                        watcher.dns_servers
+                    )
+                except Exception as e:
+                    return e
+
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(check(watcher)) for watcher in watchers]
+        results = [task.result() for task in tasks]
+
+        lost: List[DomainWatcher] = []
+        for watcher, result in zip(watchers, results):
+            if isinstance(result, Exception):
+                logger.error("Error in watcher for {}: {}", watcher.domain_name, result)
+            elif result.available:
+                # Keep status as available, no notification (anti-spam)
+                logger.debug("✅ {} is still AVAILABLE", watcher.domain_name)
+                watcher.checked = True
+            else:
+                logger.warning("⚠️ {} became UNAVAILABLE - stopping watcher", watcher.domain_name)
+                lost.append(watcher)
+
+        if lost:
+            await self._mark_unavailable(lost)
+
+    async def _mark_unavailable(self, lost: List[DomainWatcher]) -> None:
+        """
+        Mark lost domains unavailable, stop monitoring them and notify
+
+        Args:
+            lost: Watchers whose domain resolved again
+        """
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Domain).where(Domain.id.in_([watcher.domain_id for watcher in lost]))
+            )
+            domains = result.scalars().all()
+
+            # Update domain statuses (one commit for the whole tick)
+            now = datetime.utcnow()
+            for domain in domains:
+                domain.previous_status = domain.status
+                domain.status = DomainStatus.UNAVAILABLE.value
+                domain.is_active = False  # Stop monitoring
+                domain.last_checked = now
+            await db.commit()
+
+            # Stop watching only once the status is stored: if the commit
+            # fails, the next tick checks these domains again
+            for watcher in lost:
+                self.watchers.pop(watcher.domain_id, None)
+
+            # Send notifications that domains were lost
+            for domain in domains:
+                try:
+                    await notification_service.send_domain_lost_notification(
+                        domain, db
+                    )
+                except Exception as e:
+                    logger.error("Failed to send lost notification: {}", e)
+
+    async def flush_last_checked(self) -> None:
+        """
+        Write last_checked for every watcher that checked since the last flush
+
+        One UPDATE ... WHERE id IN (...) and one commit, whatever the number
+        of watchers.
+        """
+        ids = []
+        for watcher in self.watchers.values():
+            if watcher.checked:
+                watcher.checked = False
+                ids.append(watcher.domain_id)
+
+        if not ids:
+            return
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(Domain)
+                .where(Domain.id.in_(ids))
+                .values(last_checked=datetime.utcnow())
+            )
+            await db.commit()
+
+        logger.debug("Updated last_checked for {} watched domains", len(ids))
+
 
 # Global instance
 watcher_service = WatcherService()
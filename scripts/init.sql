@@ -19,8 +19,8 @@ CREATE TABLE IF NOT EXISTS domains (
     niche VARCHAR(100) NULL COMMENT 'Thématique du domaine',
     traffic INT DEFAULT 0 COMMENT 'Estimation du trafic mensuel',
     referring_domains INT DEFAULT 0 COMMENT 'Nombre de referring domains (backlinks)',
-    status ENUM('available', 'unavailable', 'unknown') DEFAULT 'unknown' COMMENT 'Statut actuel',
-    previous_status ENUM('available', 'unavailable', 'unknown') DEFAULT 'unknown' COMMENT 'Statut précédent (pour détecter les transitions)',
+    status VARCHAR(16) DEFAULT 'unknown' COMMENT 'Statut actuel',
+    previous_status VARCHAR(16) DEFAULT 'unknown' COMMENT 'Statut précédent (pour détecter les transitions)',
     last_checked DATETIME NULL COMMENT 'Date de dernière vérification',
     last_available DATETIME NULL COMMENT 'Date de dernière disponibilité détectée',
     is_active BOOLEAN DEFAULT TRUE COMMENT 'Monitoring actif/inactif',
@@ -30,7 +30,11 @@ CREATE TABLE IF NOT EXISTS domains (
     INDEX idx_is_active (is_active),
     INDEX idx_status (status),
     INDEX idx_tld (tld),
-    INDEX idx_last_checked (last_checked)
+    INDEX idx_last_checked (last_checked),
+    FULLTEXT INDEX ft_domain (domain) COMMENT 'Recherche par mot dans le nom de domaine',
+
+    CONSTRAINT ck_domains_status CHECK (status IN ('available', 'unavailable', 'unknown')),
+    CONSTRAINT ck_domains_previous_status CHECK (previous_status IN ('available', 'unavailable', 'unknown'))
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- ============================================
@@ -0,0 +1,10 @@
+-- ============================================
+-- MIGRATION: FULLTEXT index on domains.domain
+-- ============================================
+-- À exécuter une fois sur une base créée avec un init.sql antérieur à l'index
+-- ft_domain : sans lui, la recherche MATCH ... AGAINST échoue (erreur 1191).
+
+USE domain_monitor;
+
+ALTER TABLE domains
+    ADD FULLTEXT INDEX ft_domain (domain) COMMENT 'Recherche par mot dans le nom de domaine';
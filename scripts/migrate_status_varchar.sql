@@ -0,0 +1,13 @@
+-- ============================================
+-- MIGRATION: domains.status / previous_status ENUM → VARCHAR + CHECK
+-- ============================================
+-- À exécuter une fois sur une base créée avec l'ancien init.sql.
+-- Les valeurs existantes ('available', 'unavailable', 'unknown') sont conservées.
+
+USE domain_monitor;
+
+ALTER TABLE domains
+    MODIFY status VARCHAR(16) DEFAULT 'unknown' COMMENT 'Statut actuel',
+    MODIFY previous_status VARCHAR(16) DEFAULT 'unknown' COMMENT 'Statut précédent (pour détecter les transitions)',
+    ADD CONSTRAINT ck_domains_status CHECK (status IN ('available', 'unavailable', 'unknown')),
+    ADD CONSTRAINT ck_domains_previous_status CHECK (previous_status IN ('available', 'unavailable', 'unknown'));
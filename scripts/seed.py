@@ -8,6 +8,8 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from sqlalchemy import insert
+
 from app.database import AsyncSessionLocal
 from app.models import Domain, DomainStatus
 from loguru import logger
@@ -25,7 +27,7 @@ async def seed_database():
             "niche": "Tech",
             "traffic": 5000,
             "referring_domains": 150,
-            "status": DomainStatus.UNKNOWN,
+            "status": DomainStatus.UNKNOWN.value,
             "is_active": True
         },
         {
@@ -34,7 +36,7 @@ async def seed_database():
             "niche": "Finance",
             "traffic": 10000,
             "referring_domains": 300,
-            "status": DomainStatus.UNKNOWN,
+            "status": DomainStatus.UNKNOWN.value,
             "is_active": True
         },
         {
@@ -43,7 +45,7 @@ async def seed_database():
             "niche": "Health",
             "traffic": 3000,
             "referring_domains": 80,
-            "status": DomainStatus.UNKNOWN,
+            "status": DomainStatus.UNKNOWN.value,
             "is_active": True
         },
         {
@@ -52,7 +54,7 @@ async def seed_database():
             "niche": "Travel",
             "traffic": 7500,
             "referring_domains": 200,
-            "status": DomainStatus.UNKNOWN,
+            "status": DomainStatus.UNKNOWN.value,
             "is_active": True
         },
         {
@@ -61,7 +63,7 @@ async def seed_database():
             "niche": "Food",
             "traffic": 12000,
             "referring_domains": 400,
-            "status": DomainStatus.UNKNOWN,
+            "status": DomainStatus.UNKNOWN.value,
             "is_active": True
         },
         {
@@ -70,7 +72,7 @@ async def seed_database():
             "niche": "Gaming",
             "traffic": 15000,
             "referring_domains": 500,
-            "status": DomainStatus.UNKNOWN,
+            "status": DomainStatus.UNKNOWN.value,
             "is_active": True
         },
         {
@@ -79,7 +81,7 @@ async def seed_database():
             "niche": "Fashion",
             "traffic": 8000,
             "referring_domains": 250,
-            "status": DomainStatus.UNKNOWN,
+            "status": DomainStatus.UNKNOWN.value,
             "is_active": True
         },
         {
@@ -88,7 +90,7 @@ async def seed_database():
             "niche": "Sports",
             "traffic": 6000,
             "referring_domains": 180,
-            "status": DomainStatus.UNKNOWN,
+            "status": DomainStatus.UNKNOWN.value,
             "is_active": True
         },
         {
@@ -97,7 +99,7 @@ async def seed_database():
             "niche": "Education",
             "traffic": 9000,
             "referring_domains": 320,
-            "status": DomainStatus.UNKNOWN,
+            "status": DomainStatus.UNKNOWN.value,
             "is_active": True
         },
         {
@@ -106,19 +108,15 @@ async def seed_database():
             "niche": "Real Estate",
             "traffic": 11000,
             "referring_domains": 350,
-            "status": DomainStatus.UNKNOWN,
+            "status": DomainStatus.UNKNOWN.value,
             "is_active": True
         }
     ]
 
     async with AsyncSessionLocal() as db:
         try:
-            # Add domains
-            for domain_data in sample_domains:
-                domain = Domain(**domain_data)
-                db.add(domain)
-                logger.info(f"✅ Added domain: {domain_data['domain']}")
-
+            # Add domains (single multi-row INSERT)
+            await db.execute(insert(Domain), sample_domains)
             await db.commit()
 
             logger.success(f"🎉 Successfully seeded {len(sample_domains)} domains!")
@@ -4,13 +4,54 @@ Pytest configuration and fixtures
 import pytest
 import asyncio
 from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.pool import NullPool
-from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
+from sqlalchemy.pool import StaticPool
+from httpx import ASGITransport, AsyncClient
 
 from app.main import app
 from app.database import Base, get_db
 from app.models import Domain, DomainStatus
+from app.services.dns_checker import DNSChecker
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+
+def pytest_configure(config):
+    """Run the async tests on uvloop when installed, as uvicorn does in production"""
+    if uvloop is not None:
+        # pytest-asyncio creates its loops from the current policy
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+
+def pytest_unconfigure(config):
+    """Restore the default event loop policy"""
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(None)
+
+
+def pytest_addoption(parser):
+    """Add --run-network to run the tests querying real DNS servers"""
+    parser.addoption(
+        "--run-network",
+        action="store_true",
+        default=False,
+        help="run tests marked network (real DNS queries)"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip network tests unless --run-network is given"""
+    if config.getoption("--run-network"):
+        return
+
+    skip_network = pytest.mark.skip(reason="needs --run-network")
+    for item in items:
+        if "network" in item.keywords:
+            item.add_marker(skip_network)
 
 
 # Test database URL (use in-memory SQLite for tests)
@@ -18,55 +59,75 @@ TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
 
 @pytest.fixture(scope="session")
-def event_loop():
-    """Create event loop for async tests"""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+def checker() -> DNSChecker:
+    """Share one DNS checker across the session (resolvers are built lazily)"""
+    return DNSChecker()
 
 
-@pytest.fixture(scope="function")
-async def test_db() -> AsyncGenerator[AsyncSession, None]:
-    """Create test database session"""
-    # Create async engine
+@pytest.fixture(scope="session")
+async def engine() -> AsyncGenerator[AsyncEngine, None]:
+    """Create the test engine and schema once per session"""
+    # StaticPool: every checkout reuses the single in-memory connection
     engine = create_async_engine(
         TEST_DATABASE_URL,
-        poolclass=NullPool,
+        poolclass=StaticPool,
         echo=False
     )
 
+    # Let SQLAlchemy drive transactions so that SAVEPOINTs work with
+    # the sqlite3 driver
+    @event.listens_for(engine.sync_engine, "connect")
+    def disable_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def emit_begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
     # Create tables
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
-    # Create session
-    async_session = async_sessionmaker(
-        engine,
-        class_=AsyncSession,
-        expire_on_commit=False
-    )
+    yield engine
 
-    async with async_session() as session:
-        yield session
+    await engine.dispose()
 
-    # Drop tables
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
 
-    await engine.dispose()
+@pytest.fixture(scope="function")
+async def test_db(engine: AsyncEngine) -> AsyncGenerator[AsyncSession, None]:
+    """Create test database session, rolled back after each test"""
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+
+        # Commits inside the test only release a SAVEPOINT; the outer
+        # transaction is rolled back so each test starts from empty tables
+        async with AsyncSession(
+            bind=conn,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint"
+        ) as session:
+            yield session
+
+        await transaction.rollback()
+
+
+@pytest.fixture(scope="session")
+async def http_client() -> AsyncGenerator[AsyncClient, None]:
+    """Create the HTTP client once per session (calls the app in-process)"""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
 
 
 @pytest.fixture
-async def client(test_db: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
-    """Create test HTTP client"""
+async def client(test_db: AsyncSession, http_client: AsyncClient) -> AsyncGenerator[AsyncClient, None]:
+    """Create test HTTP client bound to the test database session"""
 
     async def override_get_db():
         yield test_db
 
     app.dependency_overrides[get_db] = override_get_db
 
-    async with AsyncClient(app=app, base_url="http://test") as ac:
-        yield ac
+    yield http_client
 
     app.dependency_overrides.clear()
 
@@ -80,8 +141,8 @@ async def sample_domain(test_db: AsyncSession) -> Domain:
         niche="Tech",
         traffic=5000,
         referring_domains=150,
-        status=DomainStatus.UNKNOWN,
-        previous_status=DomainStatus.UNKNOWN,
+        status=DomainStatus.UNKNOWN.value,
+        previous_status=DomainStatus.UNKNOWN.value,
         is_active=True
     )
     test_db.add(domain)
@@ -2,7 +2,13 @@
 Tests for API Endpoints
 """
 import pytest
+from unittest.mock import patch
 from httpx import AsyncClient
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.dialects import mysql
+from app.models import Domain
+from app.routers.domains import _apply_domain_filters
+from app.services.dns_checker import CheckResult
 
 
 class TestHealthEndpoint:
@@ -35,6 +41,20 @@ class TestStatsEndpoint:
         assert "by_status" in data
         assert "by_tld" in data
 
+    @pytest.mark.asyncio
+    async def test_get_stats_counts(self, client: AsyncClient, sample_domain):
+        """Test GET /api/stats aggregates"""
+        response = await client.get("/api/stats")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_domains"] == 1
+        assert data["active_domains"] == 1
+        assert data["by_status"] == {"unknown": 1}
+        assert data["by_tld"] == {"fr": 1}
+        assert data["last_check_cycle"] is None
+        assert data["notifications_today"] == 0
+
 
 class TestDomainCRUD:
     """Test domain CRUD operations"""
@@ -71,6 +91,15 @@ class TestDomainCRUD:
         assert response.status_code == 400
         assert "not supported" in response.json()["detail"]
 
+    @pytest.mark.asyncio
+    async def test_create_domain_duplicate(self, client: AsyncClient, sample_domain):
+        """Test POST /api/domains with an already monitored domain"""
+        payload = {"domain": sample_domain.domain}
+
+        response = await client.post("/api/domains", json=payload)
+
+        assert response.status_code == 409
+
     @pytest.mark.asyncio
     async def test_list_domains(self, client: AsyncClient, sample_domain):
         """Test GET /api/domains"""
@@ -126,6 +155,28 @@ class TestDomainCRUD:
         data = response.json()
         assert data["is_active"] != initial_status
 
+    @pytest.mark.asyncio
+    async def test_force_check(self, client: AsyncClient, sample_domain):
+        """Test POST /api/domains/{id}/check"""
+        with patch('app.services.availability.dns_checker.check_domain_availability') as mock_check:
+            mock_check.return_value = CheckResult(
+                available=False,
+                method="dns_test",
+                response_time_ms=50,
+                error=None
+            )
+
+            response = await client.post(f"/api/domains/{sample_domain.id}/check")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "unavailable"
+        assert data["last_checked"] is not None
+
+        # Check log was saved in the same transaction
+        get_response = await client.get(f"/api/domains/{sample_domain.id}")
+        assert len(get_response.json()["recent_checks"]) == 1
+
     @pytest.mark.asyncio
     async def test_delete_domain(self, client: AsyncClient, sample_domain):
         """Test DELETE /api/domains/{id}"""
@@ -151,6 +202,61 @@ class TestDomainFilters:
         for domain in data["domains"]:
             assert domain["tld"] == "fr"
 
+    @pytest.mark.asyncio
+    async def test_search(self, client: AsyncClient, sample_domain):
+        """Test GET /api/domains?search=..."""
+        response = await client.get("/api/domains?search=EXAMPLE")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 1
+        assert data["domains"][0]["domain"] == sample_domain.domain
+
+        response = await client.get("/api/domains?search=nomatch")
+        assert response.json()["total"] == 0
+
+    @pytest.mark.parametrize("search, against, like", [
+        ("example.net", "+example* +net*", None),
+        ("example.com", "+example*", "example.com"),  # "com" is a stopword
+        ("www.my-shop.fr", "+shop*", "www.my-shop.fr"),
+        ("shop.com", "+shop*", "shop.com"),
+        ("ex.fr", None, "ex.fr"),  # Nothing indexable: LIKE only
+    ])
+    def test_mysql_search_terms(self, search, against, like):
+        """Test that unindexed words are left out of MATCH and checked with LIKE"""
+        stmt = _apply_domain_filters(
+            lambda_stmt(lambda: select(Domain.id)),
+            None, None, None, search, "mysql"
+        )
+        compiled = stmt.compile(dialect=mysql.dialect())
+        sql = str(compiled)
+
+        assert ("MATCH" in sql) == (against is not None)
+        assert ("LIKE" in sql) == (like is not None)
+        assert compiled.params.get("against_1") == against
+        assert compiled.params.get("search_1") == like
+
+    @pytest.mark.asyncio
+    async def test_combined_filters(self, client: AsyncClient, sample_domain):
+        """Test GET /api/domains with several filters and sorting"""
+        response = await client.get(
+            "/api/domains?status=unknown&tld=FR&is_active=true&sort_by=domain&sort_order=asc"
+        )
+
+        assert response.status_code == 200
+        assert response.json()["total"] == 1
+
+        response = await client.get("/api/domains?status=available&tld=fr")
+        assert response.json()["total"] == 0
+        assert response.json()["domains"] == []
+
+    @pytest.mark.asyncio
+    async def test_filter_by_invalid_status(self, client: AsyncClient, sample_domain):
+        """Test GET /api/domains?status=... with an unknown status"""
+        response = await client.get("/api/domains?status=expired")
+
+        assert response.status_code == 400
+
     @pytest.mark.asyncio
     async def test_pagination(self, client: AsyncClient, sample_domain):
         """Test GET /api/domains with pagination"""
@@ -4,7 +4,7 @@ Tests for Availability Service
 import pytest
 from unittest.mock import AsyncMock, patch
 from app.models import Domain, DomainStatus
-from app.services.availability import availability_service
+from app.services.availability import DomainView, availability_service
 from app.services.dns_checker import CheckResult
 
 
@@ -36,8 +36,8 @@ class TestAvailabilityService:
         """Test verification when domain becomes available (transition)"""
 
         # Set initial status to unavailable
-        sample_domain.status = DomainStatus.UNAVAILABLE
-        sample_domain.previous_status = DomainStatus.UNAVAILABLE
+        sample_domain.status = DomainStatus.UNAVAILABLE.value
+        sample_domain.previous_status = DomainStatus.UNAVAILABLE.value
         await test_db.commit()
 
         # Mock DNS checker to return available for both checks
@@ -61,8 +61,8 @@ class TestAvailabilityService:
         """Test verification when domain stays available (no notification)"""
 
         # Set initial status to available
-        sample_domain.status = DomainStatus.AVAILABLE
-        sample_domain.previous_status = DomainStatus.AVAILABLE
+        sample_domain.status = DomainStatus.AVAILABLE.value
+        sample_domain.previous_status = DomainStatus.AVAILABLE.value
         await test_db.commit()
 
         # Mock DNS checker to return available
@@ -79,3 +79,77 @@ class TestAvailabilityService:
             assert result.is_available is True
             assert result.should_notify is False  # No transition (anti-spam)
             assert result.new_status == "available"
+            assert len(result.check_logs) == 1  # Double check skipped
+
+    @pytest.mark.asyncio
+    async def test_verify_domain_parallel_double_check(self, test_db, sample_domain):
+        """Test that parallel mode queries both servers without waiting"""
+        results = {
+            availability_service.primary_dns: CheckResult(True, "dns_primary", 50),
+            availability_service.secondary_dns: CheckResult(False, "dns_secondary", 50),
+        }
+
+        async def fake_check(domain, dns_server):
+            return results[dns_server]
+
+        with patch.object(availability_service, 'parallel_double_check', True), \
+                patch('app.services.availability.asyncio.sleep') as mock_sleep, \
+                patch('app.services.availability.dns_checker.check_domain_availability', side_effect=fake_check):
+            result = await availability_service.verify_domain(sample_domain, test_db)
+
+        mock_sleep.assert_not_called()
+        assert result.is_available is False  # Both servers must agree
+        assert [log["check_method"] for log in result.check_logs] == ["dns_primary", "dns_secondary"]
+
+    @pytest.mark.asyncio
+    async def test_verify_domains(self, test_db, sample_domain):
+        """Test concurrent verification of several domains"""
+        other_domain = Domain(
+            domain="other.com",
+            tld="com",
+            status=DomainStatus.UNKNOWN.value,
+            previous_status=DomainStatus.UNKNOWN.value,
+            is_active=True
+        )
+        test_db.add(other_domain)
+        await test_db.commit()
+
+        with patch('app.services.availability.dns_checker.check_domain_availability') as mock_check:
+            mock_check.return_value = CheckResult(
+                available=False,
+                method="dns_test",
+                response_time_ms=50,
+                error=None
+            )
+
+            results = await availability_service.verify_domains(
+                [sample_domain, other_domain], test_db
+            )
+
+            assert [r.new_status for r in results] == ["unavailable", "unavailable"]
+            assert sample_domain.status == DomainStatus.UNAVAILABLE.value
+            assert other_domain.status == DomainStatus.UNAVAILABLE.value
+
+    @pytest.mark.asyncio
+    async def test_verify_domains_isolates_errors(self, test_db):
+        """Test that a failing check does not cancel the other verifications"""
+        batch = [
+            DomainView(1, "example.fr", "fr", DomainStatus.UNKNOWN.value, DomainStatus.UNKNOWN.value),
+            DomainView(2, "other.com", "com", DomainStatus.UNKNOWN.value, DomainStatus.UNKNOWN.value),
+        ]
+
+        async def fake_check(domain, dns_server):
+            if domain == "example.fr":
+                raise RuntimeError("resolver crashed")
+            return CheckResult(available=False, method="dns_test", response_time_ms=50)
+
+        with patch('app.services.availability.asyncio.sleep'), \
+                patch('app.services.availability.dns_checker.check_domain_availability', side_effect=fake_check):
+            results = await availability_service.verify_domains(
+                batch, test_db, stagger_seconds=0.1, commit=False
+            )
+
+        assert isinstance(results[0], RuntimeError)
+        assert results[1].new_status == DomainStatus.UNAVAILABLE.value
+        assert batch[1].changes()["status"] == DomainStatus.UNAVAILABLE.value
+        assert "last_available" not in batch[1].changes()
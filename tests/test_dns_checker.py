@@ -1,47 +1,438 @@
 """
 Tests for DNS Checker Service
 """
+import asyncio
+import dataclasses
+import time
 import pytest
-from app.services.dns_checker import DNSChecker, dns_checker
+from unittest.mock import AsyncMock, patch
+import dns.resolver
+from app.services.dns_checker import CheckResult, DNSChecker, TTLCache, dns_checker
+
+
+EXISTING_DOMAIN = "google.com"
+NONEXISTENT_DOMAIN = "this-domain-definitely-does-not-exist-12345.com"
+
+
+async def stub_query(resolver, domain):
+    """In-process stand-in for DNSChecker._query: only EXISTING_DOMAIN resolves"""
+    if domain == EXISTING_DOMAIN:
+        return 300  # Answer TTL
+    raise dns.resolver.NXDOMAIN()
+
+
+@pytest.fixture(scope="module")
+async def dns_results():
+    """Resolve the real-DNS probe domains once, concurrently, for the module"""
+    names = [EXISTING_DOMAIN, NONEXISTENT_DOMAIN]
+    results = await asyncio.gather(*[
+        dns_checker.check_domain_availability(name, "8.8.8.8")
+        for name in names
+    ])
+    return dict(zip(names, results))
 
 
 class TestDNSChecker:
     """Test DNS checker functionality"""
 
-    def test_extract_tld(self):
+    @pytest.mark.parametrize("domain,expected", [
+        ("example.fr", "fr"),
+        ("example.com", "com"),
+        ("sub.example.net", "net"),
+        ("invalid", ""),
+    ], ids=["fr", "com", "subdomain", "no-dot"])
+    def test_extract_tld(self, checker, domain, expected):
         """Test TLD extraction"""
-        assert dns_checker.extract_tld("example.fr") == "fr"
-        assert dns_checker.extract_tld("example.com") == "com"
-        assert dns_checker.extract_tld("sub.example.net") == "net"
-        assert dns_checker.extract_tld("invalid") == ""
+        assert checker.extract_tld(domain) == expected
+
+    def test_extract_tld_is_cached(self):
+        """Test that repeated TLD extraction is served by the memo cache"""
+        DNSChecker.extract_tld("cached-example.fr")
+        hits = DNSChecker.extract_tld.cache_info().hits
 
-    def test_is_supported_tld(self):
+        assert dns_checker.extract_tld("cached-example.fr") == "fr"
+        assert DNSChecker.extract_tld.cache_info().hits == hits + 1
+
+    @pytest.mark.parametrize("domain,expected", [
+        ("example.fr", True),
+        ("example.com", True),
+        ("example.net", True),
+        ("example.org", False),
+        ("example.io", False),
+    ], ids=["fr", "com", "net", "org", "io"])
+    def test_is_supported_tld(self, checker, domain, expected):
         """Test TLD support validation"""
-        assert dns_checker.is_supported_tld("example.fr") is True
-        assert dns_checker.is_supported_tld("example.com") is True
-        assert dns_checker.is_supported_tld("example.net") is True
-        assert dns_checker.is_supported_tld("example.org") is False
-        assert dns_checker.is_supported_tld("example.io") is False
+        assert checker.is_supported_tld(domain) is expected
+
+    @pytest.mark.asyncio
+    async def test_resolver_reused_per_server(self):
+        """Test that each DNS server gets a single resolver instance"""
+        checker = DNSChecker()
+        resolver = checker._get_resolver("8.8.8.8")
+
+        assert checker._get_resolver("8.8.8.8") is resolver
+        assert checker._get_resolver("1.1.1.1") is not resolver
+        assert resolver.nameservers == ["8.8.8.8"]
+
+    @pytest.mark.asyncio
+    async def test_sequential_checks_share_resolver(self):
+        """Test that 100 sequential checks all go through the same resolver object"""
+        checker = DNSChecker()
+        seen = []
+
+        async def recording_query(resolver, domain):
+            seen.append(resolver)
+            raise dns.resolver.NXDOMAIN()
+
+        with patch.object(DNSChecker, "_query", new=AsyncMock(side_effect=recording_query)):
+            for i in range(100):
+                await checker.check_domain_availability(f"domain-{i}.com", "8.8.8.8")
+
+        assert len(seen) == 100
+        assert all(resolver is seen[0] for resolver in seen)
+
+    @pytest.mark.asyncio
+    async def test_sub_millisecond_answer_timed(self):
+        """Test that a sub-millisecond answer reports 1ms rather than 0"""
+        checker = DNSChecker()
+        with patch("app.services.dns_checker.time.perf_counter_ns", side_effect=[0, 300_000]), \
+                patch.object(DNSChecker, "_query", new=AsyncMock(side_effect=dns.resolver.NXDOMAIN())):
+            result = await checker.check_domain_availability("example.com", "8.8.8.8")
+
+        assert result.response_time_ms == 1
+
+    @pytest.mark.asyncio
+    async def test_cares_errors_mapped(self):
+        """Test that c-ares errors become the dnspython exceptions _resolve expects"""
+        aiodns = pytest.importorskip("aiodns")
+        checker = DNSChecker()
+        resolver = AsyncMock()
+
+        resolver.query_dns.side_effect = aiodns.error.DNSError(aiodns.error.ARES_ENOTFOUND, "not found")
+        with pytest.raises(dns.resolver.NXDOMAIN):
+            await checker._query(resolver, "example.com")
+
+        resolver.query_dns.side_effect = aiodns.error.DNSError(aiodns.error.ARES_ETIMEOUT, "timeout")
+        with pytest.raises(dns.resolver.Timeout):
+            await checker._query(resolver, "example.com")
 
     @pytest.mark.asyncio
     async def test_check_existing_domain(self):
         """Test checking an existing domain (should be unavailable)"""
-        result = await dns_checker.check_domain_availability(
-            "google.com",
-            "8.8.8.8"
-        )
+        with patch.object(DNSChecker, "_query", new=AsyncMock(side_effect=stub_query)):
+            result = await DNSChecker().check_domain_availability(EXISTING_DOMAIN, "8.8.8.8")
 
         assert result.available is False
-        assert result.response_time_ms > 0
+        assert result.method == "dns_8_8_8_8"
         assert result.error is None
 
     @pytest.mark.asyncio
     async def test_check_nonexistent_domain(self):
         """Test checking a non-existent domain (should be available)"""
-        result = await dns_checker.check_domain_availability(
-            "this-domain-definitely-does-not-exist-12345.com",
-            "8.8.8.8"
-        )
+        with patch.object(DNSChecker, "_query", new=AsyncMock(side_effect=stub_query)):
+            result = await DNSChecker().check_domain_availability(NONEXISTENT_DOMAIN, "8.8.8.8")
+
+        assert result.available is True
+        assert result.error is None
+
+
+@pytest.mark.network
+class TestRealDNS:
+    """Same checks against Google Public DNS (run with --run-network)"""
+
+    @pytest.mark.asyncio
+    async def test_check_existing_domain(self, dns_results):
+        """Test that a registered domain resolves (unavailable)"""
+        result = dns_results[EXISTING_DOMAIN]
+
+        assert result.available is False
+        assert result.response_time_ms > 0
+        assert result.error is None
+
+    @pytest.mark.asyncio
+    async def test_check_nonexistent_domain(self, dns_results):
+        """Test that an unregistered domain gets NXDOMAIN (available)"""
+        result = dns_results[NONEXISTENT_DOMAIN]
 
         assert result.available is True
         assert result.response_time_ms > 0
+
+
+class TestCheckResult:
+    """Test the DNS check result type"""
+
+    def test_slotted_and_frozen(self):
+        """Test that results carry no __dict__ and cannot be mutated"""
+        result = CheckResult(available=True, method="dns_test", response_time_ms=5)
+
+        assert not hasattr(result, "__dict__")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            result.available = False
+
+
+class TestTTLCache:
+    """Test the resolved-domain cache"""
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted when full"""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert len(cache) == 2
+
+    def test_expired_entry(self):
+        """Test that entries past their TTL are dropped"""
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("a", 1)
+        with patch("app.services.dns_checker.time.monotonic", return_value=float("inf")):
+            assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_disabled_with_zero_ttl(self):
+        """Test that a TTL of 0 disables caching"""
+        cache = TTLCache(maxsize=10, ttl=0)
+        cache.set("a", 1)
+        assert cache.get("a") is None
+
+    @pytest.mark.asyncio
+    async def test_resolved_answer_cached(self):
+        """Test that a resolved (unavailable) answer skips the next lookup"""
+        checker = DNSChecker()
+        with patch.object(DNSChecker, "_query", new=AsyncMock(return_value=300)) as resolve:
+            first = await checker.check_domain_availability("example.com", "8.8.8.8")
+            second = await checker.check_domain_availability("example.com", "8.8.8.8")
+
+        assert first.available is False
+        assert second is first
+        assert resolve.await_count == 1
+
+    def test_entry_ttl_capped(self):
+        """Test that a per-entry TTL can shorten but not extend the cache TTL"""
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("short", 1, ttl=5)
+        cache.set("long", 2, ttl=3600)
+        cache.set("expired", 3, ttl=0)
+
+        with patch("app.services.dns_checker.time.monotonic", return_value=time.monotonic() + 30):
+            assert cache.get("short") is None
+            assert cache.get("long") == 2
+        assert cache.get("expired") is None
+
+    @pytest.mark.asyncio
+    async def test_zero_ttl_answer_not_cached(self):
+        """Test that an answer with a DNS TTL of 0 is looked up again"""
+        checker = DNSChecker()
+        with patch.object(DNSChecker, "_query", new=AsyncMock(return_value=0)) as resolve:
+            first = await checker.check_domain_availability("example.com", "8.8.8.8")
+            await checker.check_domain_availability("example.com", "8.8.8.8")
+
+        assert first.available is False
+        assert resolve.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_queries_coalesced(self):
+        """Test that identical concurrent checks share one DNS query"""
+        checker = DNSChecker()
+
+        async def slow_nxdomain(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            raise dns.resolver.NXDOMAIN()
+
+        with patch.object(DNSChecker, "_query", new=AsyncMock(side_effect=slow_nxdomain)) as resolve:
+            results = await asyncio.gather(*[
+                checker.check_domain_availability("example.com", "8.8.8.8")
+                for _ in range(5)
+            ])
+
+        assert all(result.available for result in results)
+        assert resolve.await_count == 1
+        assert not checker._inflight
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit_per_tld(self):
+        """Test that a TLD's concurrency limit bounds its queries in flight on one server"""
+        checker = DNSChecker()
+        checker.set_concurrency_limit("com", "8.8.8.8", 2)
+        in_flight = 0
+        peak = 0
+
+        async def slow_nxdomain(*args, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            raise dns.resolver.NXDOMAIN()
+
+        with patch.object(DNSChecker, "_query", new=AsyncMock(side_effect=slow_nxdomain)):
+            await asyncio.gather(*[
+                checker.check_domain_availability(f"example{i}.com", "8.8.8.8")
+                for i in range(6)
+            ])
+
+        assert peak == 2
+
+        # The limit belongs to that server: the same TLD elsewhere is unbounded
+        peak = 0
+        with patch.object(DNSChecker, "_query", new=AsyncMock(side_effect=slow_nxdomain)):
+            await asyncio.gather(*[
+                checker.check_domain_availability(f"example{i}.com", "1.1.1.1")
+                for i in range(6)
+            ])
+
+        assert peak == 6
+
+    @pytest.mark.asyncio
+    async def test_concurrent_1000(self):
+        """Test that 1000 lookups through one checker overlap on one resolver"""
+        checker = DNSChecker()
+
+        async def slow_nxdomain(resolver, domain):
+            await asyncio.sleep(0.05)
+            raise dns.resolver.NXDOMAIN()
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        with patch.object(DNSChecker, "_query", new=AsyncMock(side_effect=slow_nxdomain)):
+            results = await asyncio.gather(*[
+                checker.check_domain_availability(f"domain-{i}.com", "8.8.8.8")
+                for i in range(1000)
+            ])
+        elapsed = loop.time() - start
+
+        assert all(result.available for result in results)
+        assert len(checker._resolvers) == 1
+        assert elapsed < 2  # Sequential would take 50s
+
+    @pytest.mark.asyncio
+    async def test_fastest_server_wins(self):
+        """Test that racing servers returns the fast answer without waiting for the slow one"""
+        checker = DNSChecker()
+
+        async def fake_resolve(domain, dns_server):
+            if dns_server == "10.0.0.2":
+                await asyncio.sleep(5)
+            return CheckResult(available=True, method=f"dns_{dns_server}", response_time_ms=1)
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        with patch.object(checker, "_resolve", side_effect=fake_resolve):
+            result = await checker.check_domain_availability_fastest(
+                "example.com", ["10.0.0.2", "10.0.0.1"]
+            )
+
+        assert result.method == "dns_10.0.0.1"
+        assert loop.time() - start < 0.1
+
+        # The slow query keeps running for the cache; stop it with the test
+        for task in list(checker._inflight.values()):
+            task.cancel()
+
+    @pytest.mark.asyncio
+    async def test_fastest_without_servers_uses_tld_server(self):
+        """Test that an empty server list falls back to the TLD's DNS server"""
+        checker = DNSChecker()
+
+        async def fake_resolve(domain, dns_server):
+            return CheckResult(available=True, method=f"dns_{dns_server}", response_time_ms=1)
+
+        with patch.object(checker, "_resolve", side_effect=fake_resolve):
+            result = await checker.check_domain_availability_fastest("example.fr", ())
+
+        assert result.method == f"dns_{checker.get_dns_server_for_tld('fr')}"
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_keeps_shared_query(self):
+        """Test that cancelling one caller does not fail the others joined to its query"""
+        checker = DNSChecker()
+
+        async def slow_nxdomain(resolver, domain):
+            await asyncio.sleep(0.01)
+            raise dns.resolver.NXDOMAIN()
+
+        with patch.object(DNSChecker, "_query", new=AsyncMock(side_effect=slow_nxdomain)):
+            first = asyncio.ensure_future(checker.check_domain_availability("example.com", "8.8.8.8"))
+            second = asyncio.ensure_future(checker.check_domain_availability("example.com", "8.8.8.8"))
+            await asyncio.sleep(0)
+            first.cancel()
+            result = await second
+
+        assert result.available is True
+        assert first.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_negative_cache_ttl_expires(self):
+        """Test that an NXDOMAIN answer is served from cache only until its TTL"""
+        checker = DNSChecker()
+        ttl = checker.nxdomain_cache.ttl
+
+        with patch.object(DNSChecker, "_query", new=AsyncMock(side_effect=dns.resolver.NXDOMAIN())) as resolve:
+            await checker.check_domain_availability("example.com", "8.8.8.8")
+            await checker.check_domain_availability("example.com", "8.8.8.8")
+            assert resolve.await_count == 1
+
+            later = time.monotonic() + ttl + 1
+            with patch("app.services.dns_checker.time.monotonic", return_value=later):
+                result = await checker.check_domain_availability("example.com", "8.8.8.8")
+
+        assert result.available is True
+        assert resolve.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_prefetch_sibling_tlds(self):
+        """Test that a cache miss warms the cache for the other supported TLDs"""
+        checker = DNSChecker()
+        checker.prefetch = True
+        checker.supported_tlds = frozenset({"fr", "com", "net"})
+
+        with patch.object(DNSChecker, "_query", new=AsyncMock(side_effect=dns.resolver.NXDOMAIN())) as resolve:
+            await checker.check_domain_availability("example.com", "8.8.8.8")
+            await asyncio.sleep(0.05)
+
+            queried = sorted(call.args[1] for call in resolve.await_args_list)
+            assert queried == ["example.com", "example.fr", "example.net"]
+
+            # Served from the warmed cache, no new query
+            await checker.check_domain_availability("example.fr", "8.8.8.8")
+            assert resolve.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_prefetch_uses_sibling_tld_servers(self):
+        """Test that siblings of a TLD-server check are cached for their own TLD servers"""
+        checker = DNSChecker()
+        checker.prefetch = True
+        checker.supported_tlds = frozenset({"fr", "com", "net"})
+        afnic = checker.get_dns_server_for_tld("fr")
+        verisign = checker.get_dns_server_for_tld("com")
+
+        with patch.object(DNSChecker, "_query", new=AsyncMock(side_effect=dns.resolver.NXDOMAIN())) as resolve:
+            await checker.check_domain_availability("example.fr", afnic)
+            await asyncio.sleep(0.05)
+            assert resolve.await_count == 3
+
+            # The real checks of the siblings (create_domain, watchers) hit the cache
+            await checker.check_domain_availability("example.com", verisign)
+            await checker.check_domain_availability("example.net", checker.get_dns_server_for_tld("net"))
+            assert resolve.await_count == 3
+
+        assert checker.nxdomain_cache.get(("example.com", afnic)) is None
+
+    @pytest.mark.asyncio
+    async def test_invalidate_forces_new_lookup(self):
+        """Test that invalidate() drops cached answers for the domain"""
+        checker = DNSChecker()
+        with patch.object(DNSChecker, "_query", new=AsyncMock(side_effect=dns.resolver.NXDOMAIN())) as resolve:
+            await checker.check_domain_availability("example.com", "8.8.8.8")
+            await checker.check_domain_availability("example.com", "8.8.8.8")
+            assert resolve.await_count == 1  # Second answer from cache
+
+            checker.invalidate("example.com")
+            await checker.check_domain_availability("example.com", "8.8.8.8")
+
+        assert resolve.await_count == 2
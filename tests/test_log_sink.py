@@ -0,0 +1,84 @@
+"""
+Tests for the batched Loguru file sink
+"""
+import pytest
+from pydantic import ValidationError
+
+from app.config import Settings
+from app.log_sink import BatchedFileSink, parse_size, parse_duration
+
+
+class TestParsers:
+    """Test rotation/retention string parsing"""
+
+    def test_parse_size(self):
+        """Test size strings (decimal and binary units)"""
+        assert parse_size("10 MB") == 10_000_000
+        assert parse_size("512 KiB") == 512 * 1024
+        assert parse_size("100 B") == 100
+        with pytest.raises(ValueError):
+            parse_size("ten megabytes")
+
+    def test_parse_duration(self):
+        """Test duration strings"""
+        assert parse_duration("30 days") == 30 * 86400
+        assert parse_duration("12 hours") == 12 * 3600
+        with pytest.raises(ValueError):
+            parse_duration("30 fortnights")
+
+
+class TestBatchedFileSink:
+    """Test buffering, flushing and rotation"""
+
+    def test_records_flushed_on_stop(self, tmp_path):
+        """Test that buffered records are written when the sink stops"""
+        sink = BatchedFileSink(str(tmp_path / "app.log"), flush_interval=60)
+        for i in range(100):
+            sink.write(f"line {i}\n")
+        sink.stop()
+
+        lines = (tmp_path / "app.log").read_text().splitlines()
+        assert lines == [f"line {i}" for i in range(100)]
+
+    def test_rotation_with_compression(self, tmp_path):
+        """Test that the file is rotated and zipped past the size limit"""
+        sink = BatchedFileSink(str(tmp_path / "app.log"), rotation="1 KB", max_buffer_bytes=512)
+        for i in range(100):
+            sink.write(f"record number {i:04d}\n")
+        sink.stop()
+
+        assert list(tmp_path.glob("app.*.log.zip"))
+        assert (tmp_path / "app.log").exists()
+
+    def test_failed_rotation_keeps_writing(self, tmp_path, monkeypatch, capsys):
+        """Test that a failed rename leaves the sink writing to an open file"""
+        sink = BatchedFileSink(str(tmp_path / "app.log"), rotation="1 KB", flush_interval=60)
+
+        def failing_rename(src, dst):
+            raise OSError("rename refused")
+
+        monkeypatch.setattr("app.log_sink.os.rename", failing_rename)
+        sink.write("x" * 2000 + "\n")
+        sink._flush_buffer()
+        sink.write("after the failed rotation\n")
+        sink.stop()
+
+        assert "after the failed rotation" in (tmp_path / "app.log").read_text()
+        captured = capsys.readouterr()
+        assert "rename refused" in captured.err
+        assert "closed file" not in captured.err
+        assert captured.out == ""
+
+
+class TestRotationSetting:
+    """Test LOG_ROTATION validation in Settings"""
+
+    @pytest.mark.parametrize("rotation", ["1 day", "00:00", "1 week"])
+    def test_time_rotation_rejected(self, rotation):
+        """Test that Loguru time/interval rotations fail with a clear error"""
+        with pytest.raises(ValidationError, match="LOG_ROTATION must be a size"):
+            Settings(log_rotation=rotation)
+
+    def test_size_rotation_accepted(self):
+        """Test that size rotations are accepted"""
+        assert Settings(log_rotation="512 KiB").log_rotation == "512 KiB"
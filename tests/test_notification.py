@@ -0,0 +1,31 @@
+"""
+Tests for Notification Service
+"""
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.services.notification import notification_service
+
+
+class TestWebhookWarmup:
+    """Test the periodic webhook host lookup"""
+
+    @pytest.mark.asyncio
+    async def test_failed_lookup_is_not_raised(self):
+        """Test that a failed lookup only logs (the client resolves on its own)"""
+        loop = MagicMock()
+        loop.getaddrinfo = AsyncMock(side_effect=OSError("no route"))
+        with patch('app.services.notification.asyncio.get_running_loop', return_value=loop):
+            await notification_service.refresh_webhook_address()
+
+        loop.getaddrinfo.assert_awaited_once()
+
+
+class TestRetryBackoff:
+    """Test webhook retry delays"""
+
+    def test_backoff_delay_bounds(self):
+        """Test that the jittered delay stays within the exponential bound"""
+        base = notification_service.retry_delay
+        for attempt in range(1, 5):
+            for _ in range(50):
+                assert 0 <= notification_service._backoff_delay(attempt) <= base * 2 ** (attempt - 1)
@@ -0,0 +1,172 @@
+"""
+Tests for Scheduler Service
+"""
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import patch
+from sqlalchemy import delete, select
+from app.models import CheckLog, Domain, DomainStatus
+from app.services.availability import availability_service
+from app.services.dns_checker import CheckResult, dns_checker
+from app.services.notification import NotificationResult
+from app.services.scheduler import scheduler_service
+
+
+class TestSchedulerService:
+    """Test the check cycle"""
+
+    @pytest.mark.asyncio
+    async def test_run_check_cycle(self, test_db, sample_domain):
+        """Test that a cycle updates the domain, logs checks and flags the notification"""
+
+        @asynccontextmanager
+        async def session_factory():
+            yield test_db
+
+        async def fake_notify(domain, db, commit=True):
+            # Embed fields must be loaded even though the cycle reads plain rows
+            assert (domain.niche, domain.traffic) == ("Tech", 5000)
+            return NotificationResult(success=True, http_status=204, response="Success")
+
+        taken_domain = Domain(
+            domain="taken.com",
+            tld="com",
+            status=DomainStatus.UNKNOWN.value,
+            previous_status=DomainStatus.UNKNOWN.value,
+            is_active=True
+        )
+        test_db.add(taken_domain)
+        await test_db.commit()
+
+        async def fake_check(domain, dns_server):
+            return CheckResult(available=domain != "taken.com", method="dns_test", response_time_ms=50)
+
+        domain_id, taken_id = sample_domain.id, taken_domain.id
+        test_db.expunge_all()  # The cycle must not rely on already loaded rows
+
+        with patch('app.services.scheduler.AsyncSessionLocal', session_factory), \
+                patch('app.services.availability.asyncio.sleep'), \
+                patch('app.services.scheduler.asyncio.sleep'), \
+                patch('app.services.availability.dns_checker.check_domain_availability', side_effect=fake_check), \
+                patch('app.services.scheduler.notification_service.send_discord_notification',
+                      side_effect=fake_notify) as mock_notify:
+            await scheduler_service.run_check_cycle()
+
+        mock_notify.assert_awaited_once()
+        domain = await test_db.get(Domain, domain_id)
+        assert domain.status == DomainStatus.AVAILABLE.value
+        assert domain.last_available is not None
+        taken = await test_db.get(Domain, taken_id)
+        assert taken.status == DomainStatus.UNAVAILABLE.value
+        assert taken.last_checked is not None
+        assert taken.last_available is None
+
+        result = await test_db.execute(
+            select(CheckLog).where(CheckLog.domain_id == domain_id).order_by(CheckLog.id)
+        )
+        logs = result.scalars().all()
+        assert len(logs) == 2
+        assert [log.notification_sent for log in logs] == [False, True]
+
+    @pytest.mark.asyncio
+    async def test_domain_deleted_mid_cycle(self, test_db, sample_domain):
+        """Test that deleting a domain during the checks keeps the rest of the batch"""
+
+        @asynccontextmanager
+        async def session_factory():
+            yield test_db
+
+        deleted_domain = Domain(
+            domain="deleted.com",
+            tld="com",
+            status=DomainStatus.UNKNOWN.value,
+            previous_status=DomainStatus.UNKNOWN.value,
+            is_active=True
+        )
+        test_db.add(deleted_domain)
+        await test_db.commit()
+        domain_id, deleted_id = sample_domain.id, deleted_domain.id
+        test_db.expunge_all()
+
+        verify_domains = availability_service.verify_domains
+
+        async def verify_then_delete(*args, **kwargs):
+            results = await verify_domains(*args, **kwargs)
+            # DELETE /api/domains/{id} while the batch's DNS checks ran
+            await test_db.execute(delete(Domain).where(Domain.id == deleted_id))
+            await test_db.commit()
+            return results
+
+        available = CheckResult(available=True, method="dns_test", response_time_ms=50)
+        sent = NotificationResult(success=True, http_status=204, response="Success")
+
+        with patch('app.services.scheduler.AsyncSessionLocal', session_factory), \
+                patch('app.services.availability.asyncio.sleep'), \
+                patch('app.services.availability.dns_checker.check_domain_availability', return_value=available), \
+                patch.object(availability_service, 'verify_domains', side_effect=verify_then_delete), \
+                patch('app.services.scheduler.notification_service.send_discord_notification',
+                      return_value=sent) as mock_notify:
+            await scheduler_service.run_check_cycle()
+
+        assert mock_notify.await_count == 1  # Only the remaining domain
+        domain = await test_db.get(Domain, domain_id)
+        assert domain.status == DomainStatus.AVAILABLE.value
+        assert await test_db.get(Domain, deleted_id) is None
+
+        logs = (await test_db.execute(select(CheckLog.domain_id))).scalars().all()
+        assert logs and set(logs) == {domain_id}
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_commit_sends_no_notification(self, test_db, sample_domain):
+        """Test that nothing is posted when the batch's statuses are not stored"""
+
+        @asynccontextmanager
+        async def session_factory():
+            yield test_db
+
+        available = CheckResult(available=True, method="dns_test", response_time_ms=50)
+
+        with patch('app.services.scheduler.AsyncSessionLocal', session_factory), \
+                patch('app.services.availability.asyncio.sleep'), \
+                patch('app.services.availability.dns_checker.check_domain_availability', return_value=available), \
+                patch.object(test_db, 'commit', side_effect=RuntimeError("database down")), \
+                patch('app.services.scheduler.notification_service.send_discord_notification') as mock_notify:
+            await scheduler_service.run_check_cycle()
+
+        # The next cycle sees the old previous_status and notifies then
+        mock_notify.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_calibrate(self):
+        """Test that each TLD/server DNS concurrency follows its median RTT"""
+        afnic = dns_checker.get_dns_server_for_tld("fr")
+        verisign = dns_checker.get_dns_server_for_tld("com")
+        rtt_by_server = {
+            ("fr", afnic): 500,
+            ("com", verisign): 200,
+        }
+
+        async def fake_probe(domain, dns_server):
+            tld = domain.rsplit(".", 1)[1]
+            if tld == "net":
+                return CheckResult(available=True, method="dns_test", response_time_ms=5000, error="Timeout")
+            rtt = rtt_by_server.get((tld, dns_server), 10)
+            return CheckResult(available=True, method="dns_test", response_time_ms=rtt)
+
+        with patch('app.services.scheduler.dns_checker.probe', side_effect=fake_probe), \
+                patch('app.services.scheduler.dns_checker.check_domain_availability') as check, \
+                patch('app.services.scheduler.dns_checker.set_concurrency_limit') as set_limit:
+            limits = await scheduler_service.calibrate()
+
+        # 100 queries/s x 0.5s in flight on AFNIC; resolvers at the floor;
+        # .net unanswered
+        assert limits == {
+            ("fr", "8.8.8.8"): 8,
+            ("fr", "1.1.1.1"): 8,
+            ("fr", afnic): 50,
+            ("com", "8.8.8.8"): 8,
+            ("com", "1.1.1.1"): 8,
+            ("com", verisign): 20,
+        }
+        assert set_limit.call_count == 6
+        check.assert_not_called()  # Probes bypass the cache and prefetch
@@ -0,0 +1,117 @@
+"""
+Tests for Watcher Service
+"""
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, patch
+from app.models import Domain, DomainStatus
+from app.services.dns_checker import CheckResult
+from app.services.watcher import DomainWatcher, WatcherService
+
+
+def make_session_factory(test_db, counter=None):
+    """Build an AsyncSessionLocal replacement yielding the test session"""
+
+    @asynccontextmanager
+    async def session_factory():
+        if counter is not None:
+            counter.append(1)
+        yield test_db
+
+    return session_factory
+
+
+class TestWatcherService:
+    """Test the shared watcher tick loop"""
+
+    @pytest.mark.asyncio
+    async def test_tick_until_lost(self, test_db, sample_domain):
+        """Test that available ticks skip the database and a loss is recorded"""
+        sessions_opened = []
+        service = WatcherService()
+        service.watchers[sample_domain.id] = DomainWatcher(
+            sample_domain.id, sample_domain.domain, sample_domain.tld, ("8.8.8.8",)
+        )
+
+        available = CheckResult(available=True, method="dns_test", response_time_ms=5)
+        lost = CheckResult(available=False, method="dns_test", response_time_ms=5)
+
+        with patch('app.services.watcher.AsyncSessionLocal', make_session_factory(test_db, sessions_opened)), \
+                patch('app.services.watcher.dns_checker.check_domain_availability',
+                      side_effect=[available, available, lost]), \
+                patch('app.services.watcher.notification_service.send_domain_lost_notification',
+                      new_callable=AsyncMock) as mock_notify:
+            for _ in range(3):
+                await service._tick()
+
+        assert len(sessions_opened) == 1  # Only for the transition
+        mock_notify.assert_awaited_once()
+        assert sample_domain.status == DomainStatus.UNAVAILABLE.value
+        assert sample_domain.is_active is False
+        assert not service.is_watching(sample_domain.id)
+
+    @pytest.mark.asyncio
+    async def test_failed_commit_keeps_watching(self, test_db, sample_domain):
+        """Test that a lost domain stays watched when its update fails"""
+        service = WatcherService()
+        service.watchers[sample_domain.id] = DomainWatcher(
+            sample_domain.id, sample_domain.domain, sample_domain.tld, ("8.8.8.8",)
+        )
+
+        lost = CheckResult(available=False, method="dns_test", response_time_ms=5)
+
+        with patch('app.services.watcher.AsyncSessionLocal', make_session_factory(test_db)), \
+                patch('app.services.watcher.dns_checker.check_domain_availability', return_value=lost), \
+                patch.object(test_db, 'commit', side_effect=RuntimeError("database down")), \
+                patch('app.services.watcher.notification_service.send_domain_lost_notification',
+                      new_callable=AsyncMock) as mock_notify:
+            with pytest.raises(RuntimeError):
+                await service._tick()
+
+        mock_notify.assert_not_awaited()
+        assert service.is_watching(sample_domain.id)  # Retried on the next tick
+
+    @pytest.mark.asyncio
+    async def test_tick_checks_all_domains(self, test_db, sample_domain):
+        """Test that one tick checks every watched domain and isolates errors"""
+        other_domain = Domain(
+            domain="other.com",
+            tld="com",
+            status=DomainStatus.AVAILABLE.value,
+            previous_status=DomainStatus.AVAILABLE.value,
+            is_active=True
+        )
+        test_db.add(other_domain)
+        await test_db.commit()
+
+        service = WatcherService()
+        for domain in (sample_domain, other_domain):
+            service.watchers[domain.id] = DomainWatcher(domain.id, domain.domain, domain.tld, ("8.8.8.8",))
+
+        async def fake_check(domain, dns_server):
+            if domain == "example.fr":
+                raise RuntimeError("resolver crashed")
+            return CheckResult(available=True, method="dns_test", response_time_ms=5)
+
+        with patch('app.services.watcher.dns_checker.check_domain_availability', side_effect=fake_check) as mock_check:
+            await service._tick()
+
+        assert mock_check.call_count == 2
+        assert service.watchers[sample_domain.id].checked is False
+        assert service.watchers[other_domain.id].checked is True
+        assert service.get_active_watchers_count() == 2
+
+    @pytest.mark.asyncio
+    async def test_flush_last_checked(self, test_db, sample_domain):
+        """Test that flagged watchers get last_checked in a single flush"""
+        service = WatcherService()
+        watcher = DomainWatcher(sample_domain.id, sample_domain.domain, sample_domain.tld, ("8.8.8.8",))
+        watcher.checked = True
+        service.watchers[sample_domain.id] = watcher
+
+        with patch('app.services.watcher.AsyncSessionLocal', make_session_factory(test_db)):
+            await service.flush_last_checked()
+
+        await test_db.refresh(sample_domain)
+        assert sample_domain.last_checked is not None
+        assert watcher.checked is False